@@ -0,0 +1,4 @@
+# ============================================================
+# LOG-APP CORE PACKAGE
+# Streamlit-free building blocks shared by the pages
+# ============================================================
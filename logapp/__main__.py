@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Guarded so spawned batch workers can import this module
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# ============================================================
+# AUTOMATIC ZONE PARAMETER PICKS
+# ============================================================
+# GR_clean / GR_shale are robust percentiles of GR per zone (P5 / P95 by
+# default) and Matrix Density is the mode of the apparent matrix density
+# RHOMAA = (RHOB - NPHI·rho_f) / (1 - NPHI) over the cleaner samples of
+# each zone. All zones are handled together: one sort of (zone, GR) for
+# the percentiles and one 2-D histogram over (zone, density bin) for the
+# modes, never one slice per zone.
+
+import numpy as np
+import pandas as pd
+
+GR_QUANTILES = (0.05, 0.95)
+DENSITY_RANGE = (1.8, 3.2)
+DENSITY_BIN = 0.01
+CLEAN_VSH = 0.25     # RHOMAA mode uses samples with linear Vsh below this
+
+
+def zone_quantiles(values, zone_ids, n_zones, quantiles):
+    # (n_zones, len(quantiles)) linear-interpolated percentiles, NaN for empty zones
+    values = np.asarray(values, dtype=float)
+    zone_ids = np.asarray(zone_ids)
+    keep = (zone_ids >= 0) & np.isfinite(values)
+    z, v = zone_ids[keep], values[keep]
+    order = np.lexsort((v, z))
+    v = v[order]
+    counts = np.bincount(z, minlength=n_zones)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    pos = starts[:, None] + np.asarray(quantiles)[None, :] * (counts[:, None] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, starts[:, None] + counts[:, None] - 1)
+    out = np.full(pos.shape, np.nan)
+    filled = counts > 0
+    if filled.any():
+        frac = pos[filled] - lo[filled]
+        out[filled] = v[lo[filled]] * (1 - frac) + v[hi[filled]] * frac
+    return out, counts
+
+
+def zone_modes(values, zone_ids, n_zones, value_range=DENSITY_RANGE, bin_width=DENSITY_BIN):
+    # Centre of the most populated bin per zone (3-bin smoothed), NaN where no samples
+    values = np.asarray(values, dtype=float)
+    zone_ids = np.asarray(zone_ids)
+    edges_lo, edges_hi = value_range
+    n_bins = int(round((edges_hi - edges_lo) / bin_width))
+    keep = (zone_ids >= 0) & (values >= edges_lo) & (values < edges_hi)
+    bins = ((values[keep] - edges_lo) / bin_width).astype(np.intp)
+    hist = np.bincount(zone_ids[keep].astype(np.intp) * n_bins + np.minimum(bins, n_bins - 1),
+                       minlength=n_zones * n_bins).reshape(n_zones, n_bins)
+    padded = np.pad(hist, ((0, 0), (1, 1)))
+    smooth = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    modes = edges_lo + (np.argmax(smooth, axis=1) + 0.5) * bin_width
+    return np.where(hist.sum(axis=1) > 0, modes, np.nan)
+
+
+def zone_picks(curves, zone_ids, zone_df, gr_quantiles=GR_QUANTILES):
+    n_zones = len(zone_df)
+    gr = np.asarray(curves["GR"], dtype=float)
+    gr_picks, counts = zone_quantiles(gr, zone_ids, n_zones, gr_quantiles)
+
+    # Apparent matrix density, NPHI standing in for porosity
+    rho_fluid = np.append(zone_df["Fluid Density"].to_numpy(dtype=float), np.nan)[zone_ids]
+    nphi = np.asarray(curves["NPHI"], dtype=float)
+    with np.errstate(all="ignore"):
+        rhomaa = (np.asarray(curves["RHOB"], dtype=float) - nphi * rho_fluid) / (1 - nphi)
+        gr_lo = np.append(gr_picks[:, 0], np.nan)[zone_ids]
+        gr_hi = np.append(gr_picks[:, 1], np.nan)[zone_ids]
+        clean = (gr - gr_lo) <= CLEAN_VSH * (gr_hi - gr_lo)
+    clean_ids = np.where(clean & (nphi < 1), zone_ids, -1)
+    rho_matrix = zone_modes(rhomaa, clean_ids, n_zones)
+    # Zones without clean samples fall back to all of their samples
+    fallback = np.isnan(rho_matrix)
+    if fallback.any():
+        rho_matrix[fallback] = zone_modes(rhomaa, np.where(nphi < 1, zone_ids, -1), n_zones)[fallback]
+
+    return pd.DataFrame({
+        "Zone Name": zone_df["Zone Name"].to_numpy(),
+        "Samples": counts,
+        "GR_clean": gr_picks[:, 0],
+        "GR_shale": gr_picks[:, 1],
+        "Matrix Density": rho_matrix,
+    })
+
+
+def apply_picks(zone_df, picks, columns=("GR_clean", "GR_shale", "Matrix Density")):
+    # Picked values replace the table's where available, everything else is kept
+    zone_df = zone_df.reset_index(drop=True).copy()
+    for col in columns:
+        values = picks[col].to_numpy(dtype=float)
+        zone_df[col] = np.where(np.isfinite(values), values, zone_df[col].to_numpy(dtype=float))
+    return zone_df
@@ -0,0 +1,130 @@
+# ============================================================
+# MULTI-WELL BATCH EVALUATION
+# ============================================================
+# Runs the tab 2 / tab 4 evaluation for a folder (or zip) of well CSVs
+# across a process pool. Each well gets its own zone table
+# (<well>_zones.csv next to it, or zones/<well>.csv) or one shared
+# table. Wells are named by their path below the source folder (without
+# .csv), so same-named files in different subfolders stay apart; hidden
+# files and folders (e.g. macOS __MACOSX/._*.csv) are skipped. Per-well
+# results and a field summary are written to out_dir; a failing well is
+# reported and never stops the rest of the batch.
+#
+# Workers are spawned, not forked: the pool is started from a threaded
+# Streamlit server (and from a job-queue thread), and forking a
+# multi-threaded process can leave children holding locked mutexes.
+
+import multiprocessing
+import os
+import tempfile
+import traceback
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .engine import evaluate_well
+from .zones import read_zone_table
+
+ZONES_SUFFIX = "_zones.csv"
+
+
+# ============================================================
+# SINGLE WELL (runs in a worker process)
+# ============================================================
+def _run_one(well_name, well_path, zones_path, settings, out_dir):
+    zone_df = read_zone_table(zones_path)
+    result_df, summary_df = evaluate_well(pd.read_csv(well_path), zone_df, settings)
+    out_path = os.path.join(out_dir, "wells", f"{well_name}_results.csv")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    result_df.to_csv(out_path, index=False)
+    summary_df.insert(0, "Well", well_name)
+    return summary_df
+
+
+# ============================================================
+# INPUT DISCOVERY
+# ============================================================
+def _hidden(name):
+    return name.startswith(".") or name == "__MACOSX"
+
+
+def find_wells(folder, shared_zones=None):
+    # Returns [(well name, well csv, zone table csv or None)]
+    wells = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if not _hidden(d)]
+        if os.path.basename(root) == "zones":
+            continue
+        for fname in sorted(files):
+            if _hidden(fname) or not fname.lower().endswith(".csv") or fname.endswith(ZONES_SUFFIX):
+                continue
+            if shared_zones is not None and os.path.abspath(os.path.join(root, fname)) == os.path.abspath(shared_zones):
+                continue
+            base = fname[:-4]
+            candidates = [os.path.join(root, base + ZONES_SUFFIX), os.path.join(root, "zones", fname)]
+            zones = next((path for path in candidates if os.path.exists(path)), shared_zones)
+            name = os.path.relpath(os.path.join(root, base), folder).replace(os.sep, "/")
+            wells.append((name, os.path.join(root, fname), zones))
+    return sorted(wells)
+
+
+def unpack(source, work_dir):
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(work_dir)
+        return work_dir
+    return source
+
+
+# ============================================================
+# BATCH RUN
+# ============================================================
+def run_batch(source, out_dir, shared_zones=None, settings=None, max_workers=None, progress=None):
+    # progress(done, total, well_name, error) is called as each well finishes; if it raises, the
+    # remaining wells are cancelled and the exception propagates
+    os.makedirs(os.path.join(out_dir, "wells"), exist_ok=True)
+    summaries, failures = [], []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        wells = find_wells(unpack(source, work_dir), shared_zones)
+        total = len(wells)
+        done = 0
+
+        for name, _, zones in wells:
+            if zones is None:
+                failures.append({"Well": name, "Error": "No zone table found"})
+                done += 1
+                if progress:
+                    progress(done, total, name, "No zone table found")
+        runnable = [well for well in wells if well[2] is not None]
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(_run_one, name, path, zones, settings, out_dir): name
+                       for name, path, zones in runnable}
+            try:
+                for future in as_completed(futures):
+                    name = futures[future]
+                    error = None
+                    try:
+                        summaries.append(future.result())
+                    except Exception as exc:
+                        error = f"{type(exc).__name__}: {exc}"
+                        failures.append({"Well": name, "Error": error,
+                                         "Traceback": "".join(traceback.format_exception(exc))})
+                    done += 1
+                    if progress:
+                        progress(done, total, name, error)
+            except BaseException:
+                # progress() raising (e.g. a cancelled job) drops the wells not started yet
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    field_summary = pd.concat(summaries, ignore_index=True) if summaries else pd.DataFrame()
+    if not field_summary.empty:
+        field_summary = field_summary.sort_values(["Well", "Top Depth"], kind="stable").reset_index(drop=True)
+    failures = pd.DataFrame(failures, columns=["Well", "Error", "Traceback"])
+    field_summary.to_csv(os.path.join(out_dir, "field_summary.csv"), index=False)
+    failures.to_csv(os.path.join(out_dir, "failures.csv"), index=False)
+    return field_summary, failures
@@ -0,0 +1,163 @@
+# ============================================================
+# STAGE-BY-STAGE BENCHMARK SUITE
+# ============================================================
+# Times every stage of the evaluation separately on seeded synthetic
+# wells (CSV ingest, zone assignment, each Vsh / porosity / Sw method,
+# net pay, zone summary and plot rendering) and writes the timings as
+# JSON. compare() reads two such files and flags stages whose throughput
+# dropped by more than a tolerance, so runs on the same machine can be
+# checked for regressions.
+#
+#   python -m logapp bench --sizes 1000 100000 --zones 1 200 --out bench.json
+#   python -m logapp bench --baseline bench.json --out new.json
+
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .decimate import MinMaxPyramid
+from .ingest import ingest_csv
+from .kernel import (
+    POROSITY_METHODS, SW_METHODS, VSH_METHODS, allocate_results, expand_zone_params,
+    net_stage, phie_stage, phit_stage, sw_stage, vsh_stage,
+)
+from .summary import zone_summary
+from .synthetic import synthetic_well
+from .tracks import plotly_log_figure, static_log_png
+from .zones import ZoneIndex
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_ZONES = [1, 20, 200]
+PLOT_PIXELS = 1200
+
+
+def _best_of(fn, repeat):
+    best = np.inf
+    with np.errstate(all="ignore"):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _stages(n_samples, n_zones, seed, work_dir):
+    # Yields (stage name, callable); stages needing a missing plotting library yield None
+    well_df, zone_df = synthetic_well(n_samples, n_zones, seed)
+    data = well_df.to_csv(index=False).encode()
+    depth = well_df["Depth"].to_numpy()
+
+    def ingest():
+        ingest_csv(data, cache_dir=tempfile.mkdtemp(dir=work_dir))
+
+    yield "csv_ingest", ingest
+    cache_dir = tempfile.mkdtemp(dir=work_dir)
+    _, curves = ingest_csv(data, cache_dir=cache_dir)
+    yield "csv_ingest_cached", lambda: ingest_csv(data, cache_dir=cache_dir)
+
+    zone_index = ZoneIndex.from_frame(zone_df)
+    zone_ids = zone_index.assign(depth)
+    yield "zone_assign", lambda: ZoneIndex.from_frame(zone_df).assign(depth)
+
+    p = expand_zone_params(zone_df, zone_ids)
+    out = allocate_results(n_samples)
+    tmp, tmp2 = np.empty(n_samples), np.empty(n_samples)
+    gr, rhob, nphi, rt = (np.asarray(curves[col]) for col in ["GR", "RHOB", "NPHI", "RT"])
+    for method in VSH_METHODS:
+        yield f"vsh_{method}", lambda method=method: vsh_stage(gr, p, method, out["Vsh"], tmp)
+    for method in POROSITY_METHODS:
+        yield f"porosity_{method}", lambda method=method: phit_stage(rhob, nphi, p, method, out["PHIT"], tmp)
+    yield "phie", lambda: phie_stage(out["PHIT"], out["Vsh"], out["PHIE"], tmp)
+    for method in SW_METHODS:
+        yield f"sw_{method}", lambda method=method: sw_stage(rt, out["PHIE"], out["Vsh"], p, method,
+                                                             out["Sw"], tmp, tmp2)
+    # Later stages read the default (Archie) saturation
+    with np.errstate(all="ignore"):
+        sw_stage(rt, out["PHIE"], out["Vsh"], p, "Archie", out["Sw"], tmp, tmp2)
+    yield "net_pay", lambda: net_stage(out["Vsh"], out["PHIE"], out["Sw"], 0.4, 0.1, 0.6, out["Net"])
+    yield "zone_summary", lambda: zone_summary(depth, zone_ids, out, zone_df)
+
+    pyramids = {}
+
+    def build_pyramids():
+        for col in ["GR", "RHOB", "NPHI", "RT", "Vsh", "PHIE", "Sw"]:
+            pyramids[col] = MinMaxPyramid(depth, curves[col] if col in curves else out[col])
+
+    yield "plot_pyramids", build_pyramids
+    build_pyramids()
+    try:
+        import matplotlib  # noqa: F401
+        yield "plot_static", lambda: static_log_png(pyramids, depth[0], depth[-1])
+    except ImportError:
+        yield "plot_static", None
+    try:
+        import plotly  # noqa: F401
+        yield "plot_webgl", lambda: plotly_log_figure(pyramids, depth[0], depth[-1], PLOT_PIXELS).to_json()
+    except ImportError:
+        yield "plot_webgl", None
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, zone_counts=DEFAULT_ZONES, seed=0, repeat=3, progress=None):
+    # progress(n_samples, n_zones, stage, seconds) is called after each stage
+    rows = []
+    work_dir = tempfile.mkdtemp(prefix="logapp_bench_")
+    try:
+        for n_samples in sizes:
+            for n_zones in zone_counts:
+                for stage, fn in _stages(n_samples, n_zones, seed, work_dir):
+                    seconds = _best_of(fn, repeat) if fn is not None else None
+                    rows.append({
+                        "samples": n_samples,
+                        "zones": n_zones,
+                        "stage": stage,
+                        "seconds": seconds,
+                        "samples_per_s": n_samples / seconds if seconds else None,
+                    })
+                    if progress:
+                        progress(n_samples, n_zones, stage, seconds)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": rows,
+    }
+
+
+def save(report, path):
+    with open(path, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare(baseline, current, tolerance=0.2):
+    # Stages (matched on samples / zones / stage) whose throughput fell by more than tolerance
+    before = {(r["samples"], r["zones"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = before.get((row["samples"], row["zones"], row["stage"]))
+        if old is None or not old["samples_per_s"] or not row["samples_per_s"]:
+            continue
+        ratio = row["samples_per_s"] / old["samples_per_s"]
+        if ratio < 1 - tolerance:
+            regressions.append({**row, "baseline_samples_per_s": old["samples_per_s"], "ratio": ratio})
+    return regressions
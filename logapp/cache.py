@@ -0,0 +1,177 @@
+# ============================================================
+# BOUNDED, THREAD-SAFE LRU CACHE
+# ============================================================
+# Shared by all sessions of the server process (the pages hold one
+# instance through st.cache_resource), so it is bounded both by entry
+# count and by total bytes and protected by a lock. Hit/miss counts and
+# the render time saved by hits are kept for display.
+#
+# Entries can be pinned with acquire(): a pinned entry is never evicted
+# until every lease on it is released (or garbage-collected with the
+# session that held it).
+
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .curves import heap_nbytes
+
+
+def sizeof(value):
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return heap_nbytes(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sum(sizeof(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(item) for item in value)
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(self, max_bytes=256 * 2**20, max_entries=256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (value, size, build seconds)
+        self._refs = {}                 # key -> open leases
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.seconds_saved += entry[2]
+            return entry[0]
+
+    def put(self, key, value, seconds=0.0):
+        size = sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size, seconds)
+            self.nbytes += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        # Oldest unpinned entries go first; pinned ones stay even over budget
+        for key in list(self._entries):
+            if self.nbytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+                break
+            if key in self._refs:
+                continue
+            _, evicted_size, _ = self._entries.pop(key)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+    def get_or_build(self, key, build):
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        start = time.perf_counter()
+        value = build()
+        return self.put(key, value, time.perf_counter() - start)
+
+    # ---- REFERENCE COUNTING ----
+    def acquire(self, key, build):
+        # Returns (value, lease); the entry stays cached while the lease is alive
+        value = self.get_or_build(key, build)
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+        return value, Lease(self, key)
+
+    def release(self, key):
+        with self._lock:
+            refs = self._refs.get(key, 0) - 1
+            if refs > 0:
+                self._refs[key] = refs
+            else:
+                self._refs.pop(key, None)
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            for key in [key for key in self._entries if key not in self._refs]:
+                self.nbytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "pinned": len(self._refs),
+                "leases": sum(self._refs.values()),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "seconds_saved": self.seconds_saved,
+            }
+
+
+class Lease:
+    # One reference on a cache entry, released explicitly or when collected
+    def __init__(self, cache, key):
+        self.key = key
+        self._finalizer = weakref.finalize(self, cache.release, key)
+
+    def release(self):
+        self._finalizer()
+
+
+# ============================================================
+# SERVER-WIDE DATASET / RESULT CACHE
+# ============================================================
+# One per server process, shared by every session and every page.
+_server_cache = None
+_server_lock = threading.Lock()
+
+
+def server_cache():
+    global _server_cache
+    with _server_lock:
+        if _server_cache is None:
+            _server_cache = LRUCache(max_bytes=int(os.environ.get("LOGAPP_SHARED_CACHE_MB", 1024)) * 2**20)
+        return _server_cache
+
+
+def array_hash(*arrays):
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(values)
+        digest.update(str(values.dtype).encode())
+        digest.update(memoryview(values).cast("B"))
+    return digest.hexdigest()
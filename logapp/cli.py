@@ -0,0 +1,153 @@
+# ============================================================
+# HEADLESS COMMAND LINE
+# ============================================================
+#   python -m logapp evaluate WELL.csv --zones ZONES.csv --out results.csv
+#   python -m logapp evaluate HUGE.csv --zones ZONES.csv --out results.csv --chunk-rows 1000000
+#   (--out may also end in .las, .parquet or .arrow)
+#   python -m logapp batch WELLS_DIR_OR_ZIP OUT_DIR [--zones shared.csv]
+#   python -m logapp bench --out bench.json [--baseline previous.json]
+
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from .engine import DEFAULT_SETTINGS, POROSITY_METHODS, SW_METHODS, VSH_METHODS, evaluate_well
+from .export import LAS_DEPTH_UNITS, available_formats, export_results, format_for, write_frames
+from .zones import read_zone_table
+
+
+def _add_settings(parser):
+    parser.add_argument("--zones", help="zone table CSV (Zone Name, Top Depth, Base Depth, parameters)")
+    parser.add_argument("--vsh-method", choices=VSH_METHODS, default=DEFAULT_SETTINGS["vsh_method"])
+    parser.add_argument("--porosity-method", choices=POROSITY_METHODS, default=DEFAULT_SETTINGS["porosity_method"])
+    parser.add_argument("--sw-method", choices=SW_METHODS, default=DEFAULT_SETTINGS["sw_method"])
+    parser.add_argument("--vsh-cutoff", type=float, default=DEFAULT_SETTINGS["vsh_cutoff"])
+    parser.add_argument("--phi-cutoff", type=float, default=DEFAULT_SETTINGS["phi_cutoff"])
+    parser.add_argument("--sw-cutoff", type=float, default=DEFAULT_SETTINGS["sw_cutoff"])
+
+
+def _settings(args):
+    return {key: getattr(args, key) for key in DEFAULT_SETTINGS}
+
+
+def _well_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _evaluate_out_of_core(args, zone_df):
+    from .outofcore import evaluate_chunked, stream_csv
+
+    _, curves = stream_csv(args.well, chunk_rows=args.chunk_rows)
+    with tempfile.TemporaryDirectory() as work_dir:
+        results, summary_df = evaluate_chunked(curves, zone_df, work_dir, _settings(args), args.chunk_rows)
+        n_samples = export_results(args.out, curves, results, results["zone_ids"], zone_df,
+                                   chunk_rows=args.chunk_rows, well=_well_name(args.well),
+                                   depth_unit=args.depth_unit)
+        del results
+    return n_samples, summary_df
+
+
+def _bench(args):
+    from . import bench
+
+    def report(n_samples, n_zones, stage, seconds):
+        timing = f"{seconds * 1e3:10.2f} ms" if seconds is not None else "   skipped"
+        print(f"{n_samples:>10,} samples {n_zones:>4} zones  {stage:<24}{timing}", file=sys.stderr)
+
+    result = bench.run_benchmarks(args.sizes or bench.DEFAULT_SIZES, args.zones or bench.DEFAULT_ZONES,
+                                  seed=args.seed, repeat=args.repeat, progress=report)
+    bench.save(result, args.out)
+    if not args.baseline:
+        return 0
+    regressions = bench.compare(bench.load(args.baseline), result, args.tolerance)
+    for row in regressions:
+        print(f"REGRESSION {row['stage']} ({row['samples']:,} samples, {row['zones']} zones): "
+              f"{row['ratio']:.0%} of baseline throughput", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m logapp", description="Log-App petrophysical evaluation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    single = commands.add_parser("evaluate", help="evaluate one well CSV")
+    single.add_argument("well", help="well log CSV (Depth, GR, RHOB, NPHI, RT, PE)")
+    single.add_argument("--out", required=True, help="result curves (.csv, .las, .parquet or .arrow)")
+    single.add_argument("--summary", help="zone summary CSV")
+    single.add_argument("--depth-unit", choices=list(LAS_DEPTH_UNITS), default="m", help="depth unit (for .las output)")
+    single.add_argument("--chunk-rows", type=int, default=None,
+                        help="out-of-core mode: stream the (depth-ordered) CSV this many rows at a time")
+    _add_settings(single)
+
+    batch = commands.add_parser("batch", help="evaluate a folder or zip of wells")
+    batch.add_argument("source", help="folder or zip of well CSVs")
+    batch.add_argument("out_dir", help="output folder")
+    batch.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    _add_settings(batch)
+
+    bench = commands.add_parser("bench", help="time each evaluation stage on synthetic wells")
+    bench.add_argument("--sizes", type=int, nargs="+", default=None, help="samples per well (default 1e3..1e6)")
+    bench.add_argument("--zones", type=int, nargs="+", default=None, help="zone counts (default 1 20 200)")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--repeat", type=int, default=3, help="best of this many runs per stage")
+    bench.add_argument("--out", required=True, help="JSON report")
+    bench.add_argument("--baseline", help="earlier JSON report to check for throughput regressions")
+    bench.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop (fraction)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "evaluate":
+        if not args.zones:
+            print("error: --zones is required for evaluate", file=sys.stderr)
+            return 2
+        try:
+            fmt = format_for(args.out)
+            if fmt not in available_formats():
+                raise ValueError(f"{fmt} export needs pyarrow, which is not installed")
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        # Bad input is reported in one line, not as a traceback
+        source = args.zones
+        try:
+            zone_df = read_zone_table(args.zones)
+            source = args.well
+            if args.chunk_rows:
+                n_samples, summary_df = _evaluate_out_of_core(args, zone_df)
+            else:
+                result_df, summary_df = evaluate_well(pd.read_csv(args.well), zone_df, _settings(args))
+                write_frames(args.out, [result_df], fmt, zone_names=zone_df["Zone Name"].astype(str),
+                             well=_well_name(args.well), depth_unit=args.depth_unit)
+                n_samples = len(result_df)
+            if args.summary:
+                summary_df.to_csv(args.summary, index=False)
+        except OSError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        except ValueError as exc:
+            print(f"error: {source}: {exc}", file=sys.stderr)
+            return 2
+        print(f"{args.well}: {n_samples} samples in {len(summary_df)} zones -> {args.out}")
+        return 0
+
+    if args.command == "bench":
+        return _bench(args)
+
+    # Imported here so single-well runs don't pay for the pool machinery
+    from .batch import run_batch
+
+    def report(done, total, well, error):
+        status = f"FAILED {error}" if error else "ok"
+        print(f"[{done}/{total}] {well}: {status}", file=sys.stderr)
+
+    field_summary, failures = run_batch(args.source, args.out_dir, args.zones, _settings(args),
+                                        max_workers=args.workers, progress=report)
+    print(f"{field_summary['Well'].nunique() if not field_summary.empty else 0} wells evaluated, "
+          f"{len(failures)} failed -> {args.out_dir}")
+    return 1 if len(failures) else 0
@@ -0,0 +1,61 @@
+# ============================================================
+# COMPACT CURVE CONTAINER
+# ============================================================
+# Curves live as separate 1-D arrays (usually memory-mapped from the
+# ingest store) instead of one float64 DataFrame. Depth keeps float64;
+# log curves are held as float32, which is well inside the precision of
+# the tools. DataFrames are only built for the rows actually displayed.
+
+import numpy as np
+import pandas as pd
+
+DEPTH_COL = "Depth"
+
+
+def compact(name, values):
+    values = np.asarray(values)
+    if name == DEPTH_COL or values.dtype.kind not in "fiu":
+        return values
+    if values.dtype == np.float32:
+        return values
+    small = values.astype(np.float32)
+    # Keep float64 only where float32 would overflow
+    if np.array_equal(np.isfinite(small), np.isfinite(values)):
+        return small
+    return values
+
+
+def heap_nbytes(values):
+    # Memory-mapped arrays live in the OS page cache, not in the session
+    if isinstance(values, np.memmap) or isinstance(getattr(values, "base", None), np.memmap):
+        return 0
+    return int(values.nbytes)
+
+
+class CurveSet:
+    def __init__(self, curves):
+        self._curves = dict(curves)
+
+    @property
+    def columns(self):
+        return list(self._curves)
+
+    def __len__(self):
+        return len(next(iter(self._curves.values()))) if self._curves else 0
+
+    def __contains__(self, name):
+        return name in self._curves
+
+    def __getitem__(self, name):
+        return self._curves[name]
+
+    def numeric_columns(self):
+        return [name for name, values in self._curves.items() if values.dtype.kind in "fiu"]
+
+    def frame(self, rows=slice(None), columns=None):
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({name: np.asarray(self._curves[name][rows]) for name in columns})
+
+    @property
+    def nbytes(self):
+        return sum(heap_nbytes(values) for values in self._curves.values())
@@ -0,0 +1,75 @@
+# ============================================================
+# LEVEL-OF-DETAIL DECIMATION FOR DEPTH TRACKS
+# ============================================================
+# A curve is reduced to a min/max envelope per screen pixel, so spikes
+# survive decimation. The envelopes are precomputed once as a pyramid
+# (level k bins 2**k samples), which makes a window query cost
+# O(pixels) whatever the well length. Windows that hold no more than
+# about two samples per pixel are returned at full resolution.
+#
+# Levels below MIN_LEVEL are not stored: a window that needs them spans
+# at most a few thousand samples and is reduced on the fly. This keeps
+# the pyramid (mins and maxs, in the curve's dtype) at half the curve's
+# size instead of twice it.
+
+import numpy as np
+
+MIN_LEVEL = 3
+
+
+def _reduce(values, k):
+    # Min/max of consecutive bins of 2**k samples, the last bin may be partial
+    size = 1 << k
+    pad = -len(values) % size
+    if pad:
+        values = np.concatenate([values, np.full(pad, np.nan, dtype=values.dtype)])
+    bins = values.reshape(-1, size)
+    return np.fmin.reduce(bins, axis=1), np.fmax.reduce(bins, axis=1)
+
+
+class MinMaxPyramid:
+    def __init__(self, depth, values):
+        self.depth = np.asarray(depth)
+        values = np.asarray(values)
+        self.values = values if values.dtype.kind == "f" else values.astype(float)
+        self.levels = []    # levels[i] bins 2**(MIN_LEVEL + i) samples
+        if len(self.values) > 1 << MIN_LEVEL:
+            mins, maxs = _reduce(self.values, MIN_LEVEL)
+            self.levels.append((mins, maxs))
+            while len(mins) > 1:
+                if len(mins) % 2:
+                    # Padded in the curve's dtype: a float64 NaN would promote float32 levels
+                    pad = np.array([np.nan], dtype=mins.dtype)
+                    mins = np.concatenate([mins, pad])
+                    maxs = np.concatenate([maxs, pad])
+                mins = np.fmin(mins[0::2], mins[1::2])
+                maxs = np.fmax(maxs[0::2], maxs[1::2])
+                self.levels.append((mins, maxs))
+
+    @property
+    def nbytes(self):
+        # The curve itself is shared with the caller, only the envelopes are owned
+        return sum(mins.nbytes + maxs.nbytes for mins, maxs in self.levels)
+
+    def window(self, top, base, n_pixels):
+        # Returns (values, depth) ready for ax.plot(values, depth)
+        lo = np.searchsorted(self.depth, top, side="left")
+        hi = np.searchsorted(self.depth, base, side="right")
+        count = hi - lo
+        if count <= 2 * n_pixels:
+            return self.values[lo:hi], self.depth[lo:hi]
+
+        k = min(int(np.log2(count / n_pixels)), MIN_LEVEL + len(self.levels) - 1)
+        first, last = lo >> k, ((hi - 1) >> k) + 1
+        if k < MIN_LEVEL:
+            mins, maxs = _reduce(self.values[first << k:last << k], k)
+        else:
+            mins, maxs = self.levels[k - MIN_LEVEL]
+            mins, maxs = mins[first:last], maxs[first:last]
+        bin_depth = self.depth[np.minimum(np.arange(first, last) << k, len(self.depth) - 1)]
+        bin_depth = np.clip(bin_depth, self.depth[lo], self.depth[hi - 1])
+
+        values = np.empty(2 * (last - first), dtype=self.values.dtype)
+        values[0::2] = mins
+        values[1::2] = maxs
+        return values, np.repeat(bin_depth, 2)
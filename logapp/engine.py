@@ -0,0 +1,84 @@
+# ============================================================
+# PETROPHYSICS ENGINE
+# ============================================================
+# Importable, UI-free entry point: the scalar/array petrophysics
+# equations used across the pages plus whole-well evaluation. Nothing
+# here imports Streamlit or matplotlib, so scripts, cron jobs and the
+# command line (python -m logapp) start fast.
+
+import numpy as np
+
+from .ingest import REQUIRED_COLS, MissingCurvesError, clean_logs
+from .kernel import POROSITY_METHODS, SW_METHODS, VSH_METHODS, evaluate
+from .saturation import sw_indonesian_full, sw_simandoux_full
+from .summary import zone_summary
+from .zones import ZoneIndex, read_zone_table
+
+__all__ = [
+    "REQUIRED_COLS", "VSH_METHODS", "POROSITY_METHODS", "SW_METHODS", "DEFAULT_SETTINGS",
+    "MissingCurvesError", "ZoneIndex", "read_zone_table",
+    "vsh_linear", "vsh_larionov", "density_porosity", "neutron_density_porosity",
+    "effective_porosity", "sw_archie", "sw_simandoux", "sw_indonesian",
+    "evaluate", "evaluate_well", "zone_summary",
+]
+
+DEFAULT_SETTINGS = {
+    "vsh_method": "Linear",
+    "porosity_method": "Density",
+    "sw_method": "Archie",
+    "vsh_cutoff": 0.4,
+    "phi_cutoff": 0.10,
+    "sw_cutoff": 0.6,
+}
+
+
+# ============================================================
+# PETROPHYSICAL FUNCTIONS
+# ============================================================
+def vsh_linear(gr, gr_clean, gr_shale):
+    vsh = (gr - gr_clean) / (gr_shale - gr_clean)
+    return np.clip(vsh, 0, 1)
+
+def vsh_larionov(gr, gr_clean, gr_shale):
+    igr = (gr - gr_clean) / (gr_shale - gr_clean)
+    vsh = 0.083 * (2 ** (3.7 * igr) - 1)
+    return np.clip(vsh, 0, 1)
+
+def density_porosity(rhob, rho_matrix, rho_fluid):
+    return (rho_matrix - rhob) / (rho_matrix - rho_fluid)
+
+def neutron_density_porosity(nphi, phi_d):
+    return (nphi + phi_d) / 2
+
+def effective_porosity(phit, vsh):
+    return phit * (1 - vsh)
+
+def sw_archie(rt, rw, phi, a, m, n):
+    return ((a * rw) / (rt * (phi ** m))) ** (1 / n)
+
+def sw_simandoux(rt, rw, phi, vsh, a=1.0, m=2.0, n=2.0, rsh=2.0):
+    # Unclipped; saturation.sw_simandoux_full also returns the convergence mask
+    return sw_simandoux_full(rt, rw, phi, vsh, a, m, n, rsh)[0]
+
+def sw_indonesian(rt, rw, phi, vsh, m, n, a=1.0, rsh=2.0):
+    return sw_indonesian_full(rt, rw, phi, vsh, a, m, n, rsh)[0]
+
+
+# ============================================================
+# WHOLE-WELL EVALUATION
+# ============================================================
+def evaluate_well(df, zone_df, settings=None):
+    # Returns (result_df, summary_df); result_df holds the zoned samples only
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    df = clean_logs(df)
+    depth = df["Depth"].to_numpy(dtype=float)
+    zone_index = ZoneIndex.from_frame(zone_df)
+    zone_ids = zone_index.assign(depth)
+    curves = {col: df[col].to_numpy(dtype=float) for col in ["GR", "RHOB", "NPHI", "RT"]}
+    results = evaluate(curves, zone_ids, zone_df, **settings)
+
+    zoned = zone_ids >= 0
+    result_df = df[zoned].assign(**{name: values[zoned] for name, values in results.items()})
+    result_df["Zone"] = zone_index.labels(zone_ids[zoned])
+    summary_df = zone_summary(depth, zone_ids, results, zone_df)
+    return result_df.reset_index(drop=True), summary_df
@@ -0,0 +1,243 @@
+# ============================================================
+# RESULT EXPORT – CSV, PARQUET, ARROW, LAS 2.0
+# ============================================================
+# The result table (input curves, Vsh, PHIT, PHIE, Sw, Net and Zone for
+# the zoned samples, as in engine.evaluate_well) is produced in row
+# chunks straight from the curve and result arrays, and every writer
+# appends chunk by chunk to a file. A multi-million-sample well is
+# never held as one DataFrame or one string. Parquet and Arrow need
+# pyarrow, which is imported on first use; available_formats() lists
+# what this server can write.
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .curves import DEPTH_COL
+from .ingest import CACHE_DIR
+from .kernel import RESULT_CURVES
+from .zones import ZoneIndex
+
+EXPORT_CHUNK = 1 << 18
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+# format -> file extension, MIME type
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow": (".arrow", "application/vnd.apache.arrow.file"),
+    "LAS 2.0": (".las", "application/octet-stream"),
+}
+LAS_NULL = -999.25
+# Depth unit as the app names it -> LAS unit mnemonic
+LAS_DEPTH_UNITS = {"m": "M", "ft": "F"}
+LAS_UNITS = {"GR": "GAPI", "RHOB": "G/C3", "NPHI": "V/V", "RT": "OHMM", "PE": "B/E",
+             "Vsh": "V/V", "PHIT": "V/V", "PHIE": "V/V", "Sw": "V/V"}
+
+
+def available_formats():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return [fmt for fmt in EXPORT_FORMATS if fmt not in ("Parquet", "Arrow")]
+    return list(EXPORT_FORMATS)
+
+
+def format_for(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, (fmt_ext, _) in EXPORT_FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Unknown export format for {path!r}, expected one of "
+                     + ", ".join(ext for ext, _ in EXPORT_FORMATS.values()))
+
+
+# ============================================================
+# RESULT TABLE IN CHUNKS
+# ============================================================
+def result_frames(curves, results, zone_ids, zone_df, chunk_rows=EXPORT_CHUNK, progress=None):
+    # Yields the zoned rows chunk by chunk; always at least one (maybe empty) frame.
+    # progress(done, total) is called with the samples read so far.
+    zone_index = ZoneIndex.from_frame(zone_df)
+    n_samples = len(zone_ids)
+    for start in range(0, max(n_samples, 1), chunk_rows):
+        stop = min(start + chunk_rows, n_samples)
+        ids = np.asarray(zone_ids[start:stop])
+        zoned = ids >= 0
+        frame = pd.DataFrame({col: np.asarray(values[start:stop])[zoned] for col, values in curves.items()})
+        for name in RESULT_CURVES + ["Net"]:
+            frame[name] = np.asarray(results[name][start:stop])[zoned]
+        frame["Zone"] = zone_index.labels(ids[zoned])
+        yield frame
+        if progress is not None:
+            progress(stop, n_samples)
+
+
+def zoned_depth(depth, zone_ids, chunk_rows=EXPORT_CHUNK):
+    for start in range(0, len(zone_ids), chunk_rows):
+        yield np.asarray(depth[start:start + chunk_rows])[np.asarray(zone_ids[start:start + chunk_rows]) >= 0]
+
+
+# ============================================================
+# WRITERS (all take an iterable of frames)
+# ============================================================
+def write_csv(path, frames):
+    n_rows = 0
+    with open(path, "w", newline="") as fh:
+        for i, frame in enumerate(frames):
+            frame.to_csv(fh, header=i == 0, index=False)
+            n_rows += len(frame)
+    return n_rows
+
+
+def _write_arrow_tables(path, frames, open_writer):
+    import pyarrow as pa
+
+    writer, n_rows = None, 0
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = open_writer(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            n_rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def write_parquet(path, frames):
+    import pyarrow.parquet as pq
+
+    # One row group per chunk
+    return _write_arrow_tables(path, frames, pq.ParquetWriter)
+
+
+def write_arrow(path, frames):
+    import pyarrow as pa
+
+    return _write_arrow_tables(path, frames, pa.ipc.new_file)
+
+
+def las_depth_header(depth_chunks):
+    # (start, stop, step) over the exported depths; step is 0 unless they are evenly spaced
+    start = stop = step = None
+    regular = True
+    for depth in depth_chunks:
+        if not len(depth):
+            continue
+        steps = np.diff(np.concatenate([[stop], depth]) if stop is not None else depth)
+        if len(steps):
+            step = steps[0] if step is None else step
+            regular &= bool(np.allclose(steps, step, rtol=1e-6, atol=1e-9))
+        start = depth[0] if start is None else start
+        stop = depth[-1]
+    if start is None:
+        return 0.0, 0.0, 0.0
+    return float(start), float(stop), float(step) if regular and step is not None else 0.0
+
+
+def write_las(path, frames, depth_header, zone_names=(), well="", field="", depth_unit="m"):
+    # LAS 2.0, wrapped = NO; Net as 0/1 and Zone as a 1-based number listed under ~Other.
+    # The required ~Well items the app doesn't know (company, location, date, ...) are left blank.
+    start, stop, step = depth_header
+    unit = LAS_DEPTH_UNITS[depth_unit]
+    codes = {name: i + 1 for i, name in enumerate(sorted(set(zone_names)))}
+    n_rows = 0
+    with open(path, "w", newline="\n") as fh:
+        for i, frame in enumerate(frames):
+            if i == 0:
+                columns = [DEPTH_COL] + [col for col in frame.columns if col != DEPTH_COL]
+                fh.write("~Version Information\n"
+                         " VERS.                 2.0 : CWLS LOG ASCII STANDARD - VERSION 2.0\n"
+                         " WRAP.                  NO : ONE LINE PER DEPTH STEP\n")
+                fh.write("~Well Information\n"
+                         f" STRT.{unit:<4} {start:>16.4f} : START DEPTH\n"
+                         f" STOP.{unit:<4} {stop:>16.4f} : STOP DEPTH\n"
+                         f" STEP.{unit:<4} {step:>16.4f} : STEP\n"
+                         f" NULL.     {LAS_NULL:>16.2f} : NULL VALUE\n"
+                         f" COMP.     {'':>16} : COMPANY\n"
+                         f" WELL.     {well:>16} : WELL\n"
+                         f" FLD .     {field:>16} : FIELD\n"
+                         f" LOC .     {'':>16} : LOCATION\n"
+                         f" PROV.     {'':>16} : PROVINCE\n"
+                         f" SRVC.     {'':>16} : SERVICE COMPANY\n"
+                         f" DATE.     {'':>16} : LOG DATE\n"
+                         f" UWI .     {'':>16} : UNIQUE WELL ID\n")
+                fh.write("~Curve Information\n")
+                for col in columns:
+                    mnemonic = "DEPT" if col == DEPTH_COL else col.upper()
+                    col_unit = unit if col == DEPTH_COL else LAS_UNITS.get(col, "")
+                    fh.write(f" {mnemonic:<8}.{col_unit:<6} : {col}\n")
+                fh.write("~Other\n")
+                for name, code in codes.items():
+                    fh.write(f" ZONE {code} = {name}\n")
+                fh.write("~A " + " ".join("DEPT" if col == DEPTH_COL else col.upper() for col in columns) + "\n")
+
+            frame = frame[columns].copy()
+            frame["Net"] = frame["Net"].astype(np.int8)
+            frame["Zone"] = frame["Zone"].map(codes).astype("Int64")
+            frame.to_csv(fh, sep=" ", header=False, index=False, float_format="%.5f", na_rep=f"{LAS_NULL}")
+            n_rows += len(frame)
+    return n_rows
+
+
+# ============================================================
+# ONE CALL PER FORMAT
+# ============================================================
+def write_frames(path, frames, fmt=None, depth_header=None, zone_names=(), well="", field="", depth_unit="m"):
+    # Writes the frames to path (format from the extension unless given); returns the row count
+    fmt = fmt or format_for(path)
+    if fmt == "CSV":
+        return write_csv(path, frames)
+    if fmt == "Parquet":
+        return write_parquet(path, frames)
+    if fmt == "Arrow":
+        return write_arrow(path, frames)
+    if fmt == "LAS 2.0":
+        if depth_header is None:
+            # Needs the depths before the data: only for frames already in memory
+            frames = list(frames)
+            depth_header = las_depth_header(frame[DEPTH_COL].to_numpy() for frame in frames)
+        return write_las(path, frames, depth_header, zone_names, well, field, depth_unit)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_results(path, curves, results, zone_ids, zone_df, fmt=None, chunk_rows=EXPORT_CHUNK,
+                   well="", field="", depth_unit="m", progress=None):
+    # Result table of an evaluation straight from its arrays
+    fmt = fmt or format_for(path)
+    depth_header = None
+    if fmt == "LAS 2.0":
+        depth_header = las_depth_header(zoned_depth(curves[DEPTH_COL], zone_ids, chunk_rows))
+    return write_frames(path, result_frames(curves, results, zone_ids, zone_df, chunk_rows, progress), fmt,
+                        depth_header, zone_df["Zone Name"].astype(str), well, field, depth_unit)
+
+
+def export_table(df, fmt):
+    # Small tables (the zone summary) as bytes
+    if fmt == "LAS 2.0":
+        raise ValueError("LAS export is for depth curves only")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "table" + EXPORT_FORMATS[fmt][0])
+        write_frames(path, [df], fmt)
+        with open(path, "rb") as fh:
+            return fh.read()
+
+
+def prune_exports(folder=EXPORT_DIR, keep=20):
+    # Drop all but the newest export files
+    try:
+        paths = [os.path.join(folder, name) for name in os.listdir(folder)]
+    except OSError:
+        return
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,177 @@
+# ============================================================
+# LOG INGEST – CONTENT-HASH KEYED COLUMNAR STORE
+# ============================================================
+# A CSV is parsed once, validated, cleaned (dropna + depth sort) and
+# written as one .npy file per curve under CACHE_DIR/<hash>/.
+# Later loads of the same bytes memory-map those files instead of
+# re-parsing the CSV. Log curves are stored as float32, Depth as float64.
+#
+# The store is capped at LOGAPP_CACHE_MB: each load marks its entry as
+# used, and publishing a new entry drops the least recently used ones
+# beyond the cap (and scratch folders left behind by a crash).
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .curves import compact
+
+REQUIRED_COLS = ["Depth", "GR", "RHOB", "NPHI", "RT", "PE"]
+CACHE_DIR = os.environ.get("LOGAPP_CACHE_DIR", ".logapp_cache")
+MANIFEST = "columns.json"
+CACHE_MAX_BYTES = int(os.environ.get("LOGAPP_CACHE_MB", 4096)) * 2**20
+# Scratch folders older than this are leftovers of an interrupted write
+SCRATCH_AGE = 24 * 3600
+
+
+class MissingCurvesError(ValueError):
+    def __init__(self, missing):
+        self.missing = list(missing)
+        super().__init__("CSV must contain all required curves, missing: " + ", ".join(self.missing))
+
+    def __reduce__(self):
+        # Keep the curve list intact when raised inside a worker process
+        return MissingCurvesError, (self.missing,)
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_text_curves(df, required_cols=()):
+    # Curves read as text (e.g. a units row under the header) are parsed as numbers.
+    # A text column counts as a curve when most of its values parse; required ones always do.
+    df = df.copy()
+    for col in df.select_dtypes(exclude=np.number).columns:
+        values = pd.to_numeric(df[col], errors="coerce")
+        if col in required_cols or values.count() > df[col].count() / 2:
+            df[col] = values
+    return df
+
+
+def clean_logs(df, required_cols=REQUIRED_COLS):
+    missing = [col for col in required_cols if col not in df.columns]
+    if missing:
+        raise MissingCurvesError(missing)
+    # The unparseable rows are then dropped with the other gaps
+    df = parse_text_curves(df, required_cols)
+    empty = [col for col in required_cols if df[col].isna().all()]
+    if empty:
+        raise MissingCurvesError(empty)
+    # Only numeric curves can be stored as flat arrays
+    df = df.select_dtypes(include=np.number)
+    return df.dropna().sort_values("Depth", kind="stable").reset_index(drop=True)
+
+
+def load_cached(key, cache_dir=CACHE_DIR, mmap=True):
+    folder = os.path.join(cache_dir, key)
+    manifest = os.path.join(folder, MANIFEST)
+    try:
+        with open(manifest) as fh:
+            columns = json.load(fh)
+        # Last use, for prune_cache()
+        os.utime(manifest)
+    except (OSError, ValueError):
+        return None
+    mode = "r" if mmap else None
+    return {name: np.load(os.path.join(folder, fname), mmap_mode=mode) for name, fname in columns}
+
+
+def curve_file(i):
+    return f"c{i:03d}.npy"
+
+
+def scratch_dir(key, cache_dir=CACHE_DIR):
+    # Entries are written into a scratch folder and renamed by publish(),
+    # so a half-written entry is never picked up
+    os.makedirs(cache_dir, exist_ok=True)
+    return tempfile.mkdtemp(prefix=key + ".", dir=cache_dir)
+
+
+def publish(tmp, key, names, cache_dir=CACHE_DIR):
+    folder = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(tmp, MANIFEST), "w") as fh:
+            json.dump([[name, curve_file(i)] for i, name in enumerate(names)], fh)
+        os.replace(tmp, folder)
+    except OSError:
+        # Another process stored the same key first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(folder, MANIFEST)):
+            raise
+    prune_cache(cache_dir, keep=key)
+
+
+def _folder_bytes(folder):
+    total = 0
+    for root, _, files in os.walk(folder):
+        for fname in files:
+            try:
+                total += os.path.getsize(os.path.join(root, fname))
+            except OSError:
+                pass
+    return total
+
+
+def prune_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=None):
+    # Drops the least recently used entries until the store fits in max_bytes.
+    # Entries still memory-mapped by a session stay readable (POSIX) until unmapped.
+    entries, total = [], 0
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        folder = os.path.join(cache_dir, name)
+        try:
+            if "." in name:
+                if time.time() - os.path.getmtime(folder) > SCRATCH_AGE:
+                    shutil.rmtree(folder, ignore_errors=True)
+                continue
+            used = os.path.getmtime(os.path.join(folder, MANIFEST))
+        except OSError:
+            # Not a curve entry (e.g. the exports folder)
+            continue
+        size = _folder_bytes(folder)
+        total += size
+        if name != keep:
+            entries.append((used, size, folder))
+    for _, size, folder in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(folder, ignore_errors=True)
+        total -= size
+
+
+def store_curves(key, curves, cache_dir=CACHE_DIR):
+    tmp = scratch_dir(key, cache_dir)
+    try:
+        for i, values in enumerate(curves.values()):
+            np.save(os.path.join(tmp, curve_file(i)), np.ascontiguousarray(values))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    publish(tmp, key, list(curves), cache_dir)
+
+
+def ingest_csv(data, cache_dir=CACHE_DIR, required_cols=REQUIRED_COLS, key=None):
+    # Returns (key, curves) where curves maps column name -> 1-D array
+    key = key or content_hash(data)
+    curves = load_cached(key, cache_dir)
+    if curves is not None:
+        return key, curves
+
+    df = clean_logs(pd.read_csv(io.BytesIO(data)), required_cols)
+    store_curves(key, {col: compact(col, df[col].to_numpy()) for col in df.columns}, cache_dir)
+    return key, load_cached(key, cache_dir)
+
+
+def curves_to_frame(curves):
+    return pd.DataFrame({name: np.asarray(values) for name, values in curves.items()})
@@ -0,0 +1,190 @@
+# ============================================================
+# BOUNDED BACKGROUND JOB QUEUE
+# ============================================================
+# Long evaluations, plot renders and batch runs are handed to a small
+# thread pool shared by every session instead of running inside the
+# Streamlit script. Jobs are keyed by their inputs: submitting a key that
+# is already queued, running or finished returns that job, so identical
+# requests from several reruns or sessions are computed once. Finished
+# jobs are kept (bounded) until a rerun picks up the result.
+#
+# A job function receives its Job as first argument and calls
+# job.report(fraction, message) as it goes; report() also raises
+# JobCancelled once cancel() was requested, so cancellation takes effect
+# at the next progress point. numpy releases the GIL in its loops, so
+# worker threads run alongside the script threads.
+#
+# Because jobs are shared, a session that no longer needs one calls
+# release() with its waiter token instead of cancel(): the job is only
+# cancelled once no session is waiting on it any more.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, key, label=""):
+        self.key = key
+        self.label = label
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.waiters = set()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def active(self):
+        return self.state in ACTIVE
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, fraction, message=""):
+        if self._cancel.is_set():
+            raise JobCancelled(self.label or str(self.key))
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        # True once the job has finished (in any state)
+        return self._done.wait(timeout)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=16, max_finished=64):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="logapp-job")
+        self._jobs = OrderedDict()   # key -> Job, finished ones in completion order
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.coalesced = 0
+
+    def submit(self, key, fn, *args, label="", waiter=None, **kwargs):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state not in (FAILED, CANCELLED) and not job.cancelled:
+                self.coalesced += 1
+                if waiter is not None:
+                    job.waiters.add(waiter)
+                return job
+            pending = sum(1 for other in self._jobs.values() if other.active)
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs pending, try again shortly")
+            job = Job(key, label)
+            if waiter is not None:
+                job.waiters.add(waiter)
+            self._jobs.pop(key, None)
+            self._jobs[key] = job
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.started = time.time()
+        try:
+            if job.cancelled:
+                raise JobCancelled(job.label)
+            job.state = RUNNING
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.state = DONE
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.state = FAILED
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                # Finished jobs move to the end; the oldest finished ones are dropped
+                if self._jobs.get(job.key) is job:
+                    self._jobs.move_to_end(job.key)
+                finished = [key for key, other in self._jobs.items() if not other.active]
+                for key in finished[:max(len(finished) - self.max_finished, 0)]:
+                    del self._jobs[key]
+            job._done.set()
+
+    def get(self, key, waiter=None):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and waiter is not None:
+                job.waiters.add(waiter)
+            return job
+
+    def cancel(self, key):
+        job = self.get(key)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def release(self, key, waiter):
+        # This waiter no longer needs the job; cancel it if nobody else does
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            job.waiters.discard(waiter)
+            if job.active and not job.waiters:
+                job.cancel()
+        return job
+
+    def forget(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.active:
+                del self._jobs[key]
+
+    def stats(self):
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {
+            "workers": self.max_workers,
+            "queued": states.count(QUEUED),
+            "running": states.count(RUNNING),
+            "finished": len(states) - states.count(QUEUED) - states.count(RUNNING),
+            "coalesced": self.coalesced,
+        }
+
+
+# One queue per server process, shared by every session
+_job_queue = None
+_job_lock = threading.Lock()
+
+
+def job_queue():
+    global _job_queue
+    with _job_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                max_workers=int(os.environ.get("LOGAPP_JOB_WORKERS", min(4, os.cpu_count() or 1))),
+                max_pending=int(os.environ.get("LOGAPP_JOB_QUEUE", 16)))
+        return _job_queue
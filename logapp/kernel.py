@@ -0,0 +1,202 @@
+# ============================================================
+# FUSED PETROPHYSICS KERNEL
+# ============================================================
+# Vsh, PHIT, PHIE, Sw and the net flag for the whole well in one pass.
+# Zone parameters are broadcast to samples through the zone-id array,
+# results go into preallocated arrays and the well is walked in blocks
+# small enough for the scratch buffers to stay in cache.
+
+import numpy as np
+
+from .saturation import sw_indonesian_full, sw_simandoux_full
+from .zones import ZONE_DEFAULTS
+
+VSH_METHODS = ["Linear", "Larionov"]
+POROSITY_METHODS = ["Density", "Neutron-Density"]
+SW_METHODS = ["Archie", "Simandoux", "Indonesian"]
+
+# kernel name -> zone table column
+ZONE_PARAMS = {
+    "gr_clean": "GR_clean",
+    "gr_shale": "GR_shale",
+    "rho_matrix": "Matrix Density",
+    "rho_fluid": "Fluid Density",
+    "a": "a",
+    "m": "m",
+    "n": "n",
+    "rw": "Rw",
+    "rsh": "Rsh",
+}
+
+RESULT_CURVES = ["Vsh", "PHIT", "PHIE", "Sw"]
+# Result curves are stored in float32, scratch arithmetic stays float64
+RESULT_DTYPE = np.float32
+BLOCK = 1 << 16
+
+
+def zone_param_table(zone_df):
+    # One extra NaN row at the end so NO_ZONE (-1) picks up NaN parameters
+    table = {}
+    for key, col in ZONE_PARAMS.items():
+        if col in zone_df:
+            values = zone_df[col].to_numpy(dtype=float)
+        else:
+            # Tables saved before a parameter existed get its default
+            values = np.full(len(zone_df), ZONE_DEFAULTS[col])
+        table[key] = np.append(values, np.nan)
+    return table
+
+
+def expand_zone_params(zone_df, zone_ids):
+    table = zone_param_table(zone_df)
+    return {key: values[zone_ids] for key, values in table.items()}
+
+
+def allocate_results(n_samples, dtype=RESULT_DTYPE):
+    out = {name: np.empty(n_samples, dtype=dtype) for name in RESULT_CURVES}
+    out["Net"] = np.empty(n_samples, dtype=bool)
+    return out
+
+
+def check_methods(vsh_method, porosity_method, sw_method):
+    if vsh_method not in VSH_METHODS:
+        raise ValueError(f"Unknown shale volume method: {vsh_method}")
+    if porosity_method not in POROSITY_METHODS:
+        raise ValueError(f"Unknown porosity method: {porosity_method}")
+    if sw_method not in SW_METHODS:
+        raise ValueError(f"Unknown water saturation method: {sw_method}")
+
+
+# Zone parameters read by each stage
+def stage_params(stage, sw_method="Archie"):
+    if stage == "Vsh":
+        return ["gr_clean", "gr_shale"]
+    if stage == "PHIT":
+        return ["rho_matrix", "rho_fluid"]
+    if stage == "Sw":
+        return ["rw", "a", "m", "n"] if sw_method == "Archie" else ["rw", "a", "m", "n", "rsh"]
+    return []
+
+
+# ============================================================
+# STAGES – in place on equally sized arrays, p holds per-sample parameters
+# ============================================================
+def vsh_stage(gr, p, method, out, tmp):
+    np.subtract(gr, p["gr_clean"], out=out)
+    np.subtract(p["gr_shale"], p["gr_clean"], out=tmp)
+    np.divide(out, tmp, out=out)
+    if method == "Larionov":
+        np.multiply(out, 3.7, out=out)
+        np.exp2(out, out=out)
+        np.subtract(out, 1, out=out)
+        np.multiply(out, 0.083, out=out)
+    np.clip(out, 0, 1, out=out)
+
+
+def phit_stage(rhob, nphi, p, method, out, tmp):
+    np.subtract(p["rho_matrix"], rhob, out=out)
+    np.subtract(p["rho_matrix"], p["rho_fluid"], out=tmp)
+    np.divide(out, tmp, out=out)
+    if method == "Neutron-Density":
+        np.add(out, nphi, out=out)
+        np.multiply(out, 0.5, out=out)
+
+
+def phie_stage(phit, vsh, out, tmp):
+    np.subtract(1, vsh, out=tmp)
+    np.multiply(phit, tmp, out=out)
+
+
+def sw_stage(rt, phie, vsh, p, method, out, tmp, tmp2, ok=None):
+    # ok (optional bool array) receives the solver mask: False where Sw is missing or outside [0, 1]
+    if method == "Archie":
+        np.power(phie, p["m"], out=tmp)
+        np.multiply(tmp, rt, out=tmp)
+        np.multiply(p["a"], p["rw"], out=tmp2)
+        np.divide(tmp2, tmp, out=out)
+        np.divide(1, p["n"], out=tmp)
+        np.power(out, tmp, out=out)
+        if ok is not None:
+            np.less_equal(out, 1, out=ok)
+            ok &= out >= 0
+    else:
+        solver = sw_simandoux_full if method == "Simandoux" else sw_indonesian_full
+        sw, valid = solver(rt, p["rw"], phie, vsh, p["a"], p["m"], p["n"], p["rsh"])
+        out[...] = sw
+        if ok is not None:
+            ok[...] = valid
+    np.clip(out, 0, 1, out=out)
+
+
+def net_stage(vsh, phie, sw, vsh_cutoff, phi_cutoff, sw_cutoff, out):
+    np.less_equal(vsh, vsh_cutoff, out=out)
+    out &= phie >= phi_cutoff
+    out &= sw <= sw_cutoff
+
+
+def sw_solver_mask(rt, phie, vsh, zone_ids, zone_df, method):
+    # True where the zoned samples' Sw had no physical root (before the clip)
+    zone_ids = np.asarray(zone_ids)
+    n_samples = len(zone_ids)
+    table = zone_param_table(zone_df)
+    table = {key: table[key] for key in stage_params("Sw", method)}
+    bad = np.zeros(n_samples, dtype=bool)
+    out, t1, t2, ok = np.empty(BLOCK), np.empty(BLOCK), np.empty(BLOCK), np.empty(BLOCK, dtype=bool)
+    with np.errstate(all="ignore"):
+        for start in range(0, n_samples, BLOCK):
+            blk = slice(start, min(start + BLOCK, n_samples))
+            k = blk.stop - start
+            p = {key: values[zone_ids[blk]] for key, values in table.items()}
+            sw_stage(rt[blk], phie[blk], vsh[blk], p, method, out[:k], t1[:k], t2[:k], ok[:k])
+            bad[blk] = ~ok[:k] & (zone_ids[blk] >= 0)
+    return bad
+
+
+# ============================================================
+# ONE-SHOT FUSED EVALUATION
+# ============================================================
+def evaluate(curves, zone_ids, zone_df,
+             vsh_method="Linear", porosity_method="Density", sw_method="Archie",
+             vsh_cutoff=0.4, phi_cutoff=0.10, sw_cutoff=0.6, out=None):
+    check_methods(vsh_method, porosity_method, sw_method)
+
+    zone_ids = np.asarray(zone_ids)
+    n_samples = len(zone_ids)
+    if out is None:
+        out = allocate_results(n_samples)
+    table = zone_param_table(zone_df)
+
+    gr = curves["GR"]
+    rhob = curves["RHOB"]
+    nphi = curves["NPHI"]
+    rt = curves["RT"]
+
+    # Only gather the parameters the selected methods read
+    needed = stage_params("Vsh") + stage_params("PHIT") + stage_params("Sw", sw_method)
+    table = {key: table[key] for key in needed}
+
+    block = min(BLOCK, max(n_samples, 1))
+    scratch = {key: np.empty(block) for key in table}
+    t1 = np.empty(block)
+    t2 = np.empty(block)
+
+    with np.errstate(all="ignore"):
+        for start in range(0, n_samples, block):
+            stop = min(start + block, n_samples)
+            k = stop - start
+            blk = slice(start, stop)
+            ids = zone_ids[blk]
+            p = {}
+            for key, values in table.items():
+                p[key] = np.take(values, ids, out=scratch[key][:k], mode="wrap")
+            vsh = out["Vsh"][blk]
+            phie = out["PHIE"][blk]
+            sw = out["Sw"][blk]
+
+            vsh_stage(gr[blk], p, vsh_method, vsh, t1[:k])
+            phit_stage(rhob[blk], nphi[blk], p, porosity_method, out["PHIT"][blk], t1[:k])
+            phie_stage(out["PHIT"][blk], vsh, phie, t1[:k])
+            sw_stage(rt[blk], phie, vsh, p, sw_method, sw, t1[:k], t2[:k])
+            net_stage(vsh, phie, sw, vsh_cutoff, phi_cutoff, sw_cutoff, out["Net"][blk])
+
+    return out
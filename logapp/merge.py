@@ -0,0 +1,144 @@
+# ============================================================
+# DEPTH RESAMPLING & MULTI-RUN MERGE
+# ============================================================
+# Several logging runs (different sample rates, overlapping intervals,
+# not every curve in every run) are put on one regular depth grid.
+# Each curve of each run is linearly interpolated with np.interp, but
+# never across a hole wider than GAP_FACTOR of that run's own sampling.
+# In overlaps the run with the highest priority wins; where it has no
+# value for a curve the next run down fills in. A "Run" curve records
+# which run owns each grid sample (-1 where none covers it).
+#
+# Bulk depth shifts are given per run and curve; shifting "Depth" moves
+# the whole run (coverage and every curve).
+#
+# Every merge variant is stored like an upload, so only the newest
+# KEEP_VARIANTS merges of the same runs are kept on disk while a user
+# tunes shifts, step and rule.
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .curves import DEPTH_COL, compact
+from .ingest import CACHE_DIR, content_hash, load_cached, store_curves
+
+RUN_COL = "Run"
+GAP_FACTOR = 2.0
+# Grid points this close to a run's first / last sample count as inside it
+DEPTH_TOL = 1e-6
+# First listed run wins / last listed run wins / finest sampling wins
+MERGE_RULES = ["first", "last", "finest"]
+KEEP_VARIANTS = 4
+
+
+def covers(depth, grid):
+    return (grid >= depth[0] - DEPTH_TOL) & (grid <= depth[-1] + DEPTH_TOL)
+
+
+def sample_step(depth):
+    depth = np.asarray(depth, dtype=float)
+    steps = np.diff(depth)
+    steps = steps[steps > 0]
+    return float(np.median(steps)) if len(steps) else np.nan
+
+
+def priority(runs, rule="first"):
+    # Run indices from lowest to highest priority
+    if rule == "first":
+        return list(range(len(runs)))[::-1]
+    if rule == "last":
+        return list(range(len(runs)))
+    if rule == "finest":
+        steps = [sample_step(run[DEPTH_COL]) for run in runs]
+        # Stable on ties: among equal steps the earlier run wins
+        return sorted(range(len(runs)), key=lambda i: (-steps[i], -i))
+    raise ValueError(f"Unknown merge rule {rule!r}, expected one of {MERGE_RULES}")
+
+
+def common_grid(runs, step=None, shifts=None):
+    # Regular grid from the shallowest run top down to the deepest base (default step: finest run sampling)
+    shifts = shifts or [{} for _ in runs]
+    # Rounded so the median of float depth steps (0.09999999...) gives a clean grid
+    step = step or round(min(sample_step(run[DEPTH_COL]) for run in runs), 6)
+    if not np.isfinite(step) or step <= 0:
+        raise ValueError("Cannot build a depth grid: runs need at least two distinct depths")
+    top = min(run[DEPTH_COL][0] + shift.get(DEPTH_COL, 0.0) for run, shift in zip(runs, shifts))
+    base = max(run[DEPTH_COL][-1] + shift.get(DEPTH_COL, 0.0) for run, shift in zip(runs, shifts))
+    # Small tolerance so a base that sits on a grid line is not dropped
+    n_steps = int(np.floor((base - top) / step + 1e-6))
+    return top + np.arange(n_steps + 1) * step
+
+
+def resample(depth, values, grid, max_gap=None):
+    # Linear interpolation onto grid; NaN outside the curve and inside holes wider than max_gap
+    depth = np.asarray(depth, dtype=float)
+    values = np.asarray(values, dtype=float)
+    out = np.interp(grid, depth, values)
+    out[~covers(depth, grid)] = np.nan
+    if max_gap is not None and len(depth) > 1:
+        right = np.clip(np.searchsorted(depth, grid), 1, len(depth) - 1)
+        left = right - 1
+        on_sample = np.minimum(np.abs(grid - depth[left]), np.abs(depth[right] - grid)) <= DEPTH_TOL
+        out[(depth[right] - depth[left] > max_gap) & ~on_sample] = np.nan
+    return out
+
+
+def merge_runs(runs, step=None, rule="first", shifts=None):
+    # runs: list of {curve: array} with increasing Depth; shifts: per run {curve: metres}
+    # Returns {curve: array} on the common grid plus the RUN_COL source-run ids
+    shifts = shifts or [{} for _ in runs]
+    grid = common_grid(runs, step, shifts)
+    order = priority(runs, rule)
+
+    run_ids = np.full(len(grid), -1, dtype=np.int8 if len(runs) < 127 else np.int16)
+    curves = {}
+    for i in order:
+        run, shift = runs[i], shifts[i]
+        depth = np.asarray(run[DEPTH_COL], dtype=float) + shift.get(DEPTH_COL, 0.0)
+        max_gap = GAP_FACTOR * sample_step(depth)
+        covered = covers(depth, grid)
+        run_ids[covered] = i
+        for name, values in run.items():
+            if name in (DEPTH_COL, RUN_COL) or np.asarray(values).dtype.kind not in "fiu":
+                continue
+            resampled = resample(depth + shift.get(name, 0.0), values, grid, max_gap)
+            merged = curves.setdefault(name, np.full(len(grid), np.nan))
+            # Higher-priority runs come later and overwrite wherever they have a value
+            have = covered & ~np.isnan(resampled)
+            merged[have] = resampled[have]
+
+    return {DEPTH_COL: grid, **{name: compact(name, values) for name, values in curves.items()},
+            RUN_COL: run_ids}
+
+
+def merge_key(run_keys, step=None, rule="first", shifts=None):
+    # Variants of the same runs share a prefix, so old ones can be found and dropped
+    runs_key = content_hash(json.dumps(list(run_keys)).encode())[:16]
+    return f"merge-{runs_key}-" + content_hash(json.dumps([list(run_keys), step, rule, shifts], sort_keys=True).encode())
+
+
+def prune_variants(key, cache_dir=CACHE_DIR, keep=KEEP_VARIANTS):
+    # Drops all but the newest merges of the same runs (mapped files stay readable on POSIX)
+    prefix = key[:key.rindex("-") + 1]
+    try:
+        folders = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+                   if name.startswith(prefix) and name != key and "." not in name]
+        folders.sort(key=os.path.getmtime, reverse=True)
+    except OSError:
+        return
+    for folder in folders[keep - 1:]:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def merged_dataset(runs, run_keys, step=None, rule="first", shifts=None, cache_dir=CACHE_DIR):
+    # Returns (key, curves) like ingest_csv; the merge is stored and memory-mapped
+    key = merge_key(run_keys, step, rule, shifts)
+    curves = load_cached(key, cache_dir)
+    if curves is not None:
+        return key, curves
+    store_curves(key, merge_runs(runs, step, rule, shifts), cache_dir)
+    prune_variants(key, cache_dir)
+    return key, load_cached(key, cache_dir)
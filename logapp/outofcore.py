@@ -0,0 +1,161 @@
+# ============================================================
+# OUT-OF-CORE (CHUNKED) INGEST AND EVALUATION
+# ============================================================
+# For logs larger than RAM. The CSV is read in row chunks and appended
+# to the same per-curve .npy store the in-memory ingest uses, so the
+# result is a set of memory-mapped curves. Evaluation then walks those
+# curves chunk by chunk into memory-mapped result files and folds each
+# chunk into a ZoneAccumulator for the zone summary. Peak memory is a
+# few chunks whatever the file size.
+#
+# The input must already be in increasing depth order: sorting would
+# need the whole depth column in memory.
+#
+# Unlike the page ingest, curves are kept in float64 so the out-of-core
+# CLI gives the same numbers as the in-memory one for the same file.
+# Those entries live under their own key (FULL_PRECISION suffix) next
+# to the float32 ones.
+
+import hashlib
+import os
+import shutil
+import struct
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from .curves import DEPTH_COL
+from .engine import DEFAULT_SETTINGS
+from .ingest import (
+    CACHE_DIR, REQUIRED_COLS, MissingCurvesError, curve_file, load_cached, parse_text_curves, publish,
+    scratch_dir,
+)
+from .kernel import RESULT_CURVES, allocate_results, evaluate
+from .summary import ZoneAccumulator, chunk_intervals
+from .zones import ZoneIndex
+
+CHUNK_ROWS = 1 << 20
+FULL_PRECISION = "-f64"
+HEADER_BYTES = 128
+
+
+class UnsortedDepthError(ValueError):
+    pass
+
+
+def file_hash(fh, block=1 << 20):
+    # Same key as ingest.content_hash on the whole bytes, without holding them
+    digest = hashlib.blake2b(digest_size=16)
+    for data in iter(lambda: fh.read(block), b""):
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _npy_header(dtype, length):
+    # Fixed-size .npy v1.0 header, rewritten in place once the length is known
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (np.dtype(dtype).str, length)
+    header = header.ljust(HEADER_BYTES - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class _ColumnWriter:
+    def __init__(self, path, dtype):
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._fh = open(path, "wb")
+        self._fh.write(_npy_header(self.dtype, 0))
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self._fh.write(memoryview(values).cast("B"))
+        self.length += len(values)
+
+    def close(self):
+        self._fh.seek(0)
+        self._fh.write(_npy_header(self.dtype, self.length))
+        self._fh.close()
+
+
+# ============================================================
+# STREAMING INGEST
+# ============================================================
+def stream_csv(path, cache_dir=CACHE_DIR, required_cols=REQUIRED_COLS, chunk_rows=CHUNK_ROWS):
+    # Returns (key, curves) like ingest_csv, reading chunk_rows rows at a time
+    with open(path, "rb") as fh:
+        key = file_hash(fh) + FULL_PRECISION
+    curves = load_cached(key, cache_dir)
+    if curves is not None:
+        return key, curves
+
+    tmp = scratch_dir(key, cache_dir)
+    writers = {}
+    try:
+        last_depth = -np.inf
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            if not writers:
+                missing = [col for col in required_cols if col not in chunk.columns]
+                if missing:
+                    raise MissingCurvesError(missing)
+                # Column set is fixed by the first chunk; curves read as text
+                # (e.g. a units row) are parsed like the others below
+                numeric = set(parse_text_curves(chunk, required_cols).select_dtypes(include=np.number).columns)
+                columns = [col for col in chunk.columns if col in numeric]
+                for i, col in enumerate(columns):
+                    writers[col] = _ColumnWriter(os.path.join(tmp, curve_file(i)), np.float64)
+
+            chunk = chunk[list(writers)].apply(pd.to_numeric, errors="coerce").dropna()
+            if chunk.empty:
+                continue
+            depth = chunk[DEPTH_COL].to_numpy(dtype=float)
+            if depth[0] < last_depth or (np.diff(depth) < 0).any():
+                raise UnsortedDepthError("Out-of-core mode needs the CSV in increasing depth order")
+            last_depth = depth[-1]
+            for col, writer in writers.items():
+                writer.append(chunk[col].to_numpy())
+
+        for writer in writers.values():
+            writer.close()
+    except BaseException:
+        for writer in writers.values():
+            writer._fh.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    publish(tmp, key, list(writers), cache_dir)
+    return key, load_cached(key, cache_dir)
+
+
+# ============================================================
+# CHUNKED EVALUATION
+# ============================================================
+def evaluate_chunked(curves, zone_df, out_dir, settings=None, chunk_rows=CHUNK_ROWS):
+    # Returns (results, summary_df); results are .npy memmaps in out_dir
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    os.makedirs(out_dir, exist_ok=True)
+    depth = curves[DEPTH_COL]
+    n_samples = len(depth)
+    zone_index = ZoneIndex.from_frame(zone_df)
+
+    buffers = allocate_results(min(chunk_rows, n_samples))
+    results = {name: open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+",
+                                 dtype=buffers[name].dtype, shape=(n_samples,))
+               for name in RESULT_CURVES + ["Net"]}
+    zone_ids = open_memmap(os.path.join(out_dir, "zone_ids.npy"), mode="w+",
+                           dtype=zone_index.id_dtype, shape=(n_samples,))
+    acc = ZoneAccumulator(len(zone_df))
+
+    for start in range(0, n_samples, chunk_rows):
+        stop = min(start + chunk_rows, n_samples)
+        ids = zone_index.assign(depth[start:stop])
+        chunk = {col: np.asarray(curves[col][start:stop]) for col in ["GR", "RHOB", "NPHI", "RT"]}
+        out = {name: values[:stop - start] for name, values in buffers.items()}
+        evaluate(chunk, ids, zone_df, **settings, out=out)
+        for name, values in out.items():
+            results[name][start:stop] = values
+        zone_ids[start:stop] = ids
+        acc.add(ids, out, chunk_intervals(depth, start, stop))
+
+    for values in [*results.values(), zone_ids]:
+        values.flush()
+    results["zone_ids"] = zone_ids
+    return results, acc.summary(zone_df)
@@ -0,0 +1,231 @@
+# ============================================================
+# INCREMENTAL EVALUATION GRAPH
+# ============================================================
+# Vsh ─┐
+#      ├─> PHIE ─> Sw ─> Net ─> (zone summary)
+# PHIT ┘
+#
+# Each node keeps its full-length result curve plus the inputs it was
+# last computed with: the selected method or cutoffs, and one row of
+# zone-table parameters per zone. On update a node recomputes only the
+# samples whose zone's inputs changed, whose upstream nodes changed, or
+# which moved to another zone. Changing a cutoff therefore only redoes
+# Net; changing one zone's Rw only redoes that zone's Sw and Net.
+#
+# Derived products (summary, sensitivity cube, plot pyramids) are held
+# under a per-session memory budget: when the graph outgrows it, the
+# least recently used products are dropped and rebuilt on demand.
+#
+# A graph's state can be snapshotted and restored into another session's
+# graph evaluating the same dataset. Snapshots share the result arrays
+# read-only; the next update copies them before writing.
+#
+# update() may run on a background job thread: it reports progress per
+# block, and an exception raised by the progress callback (a cancelled
+# job) leaves the graph empty but consistent. Whoever runs or restores
+# the graph off the script thread holds graph.lock.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .kernel import (
+    BLOCK, allocate_results, check_methods, net_stage, phie_stage, phit_stage,
+    stage_params, sw_stage, vsh_stage, zone_param_table,
+)
+from .cache import sizeof
+
+NODES = ["Vsh", "PHIT", "PHIE", "Sw", "Net"]
+UPSTREAM = {
+    "Vsh": [],
+    "PHIT": [],
+    "PHIE": ["Vsh", "PHIT"],
+    "Sw": ["Vsh", "PHIE"],
+    "Net": ["Vsh", "PHIE", "Sw"],
+}
+
+SESSION_BUDGET = int(os.environ.get("LOGAPP_SESSION_BUDGET_MB", 512)) * 2**20
+
+
+def _rows_equal(old, new):
+    return ((old == new) | (np.isnan(old) & np.isnan(new))).all(axis=1)
+
+
+class EvaluationGraph:
+    def __init__(self, curves, memory_budget=SESSION_BUDGET):
+        self.curves = {col: np.asarray(curves[col]) for col in ["GR", "RHOB", "NPHI", "RT"]}
+        self.n_samples = len(self.curves["GR"])
+        self.results = allocate_results(self.n_samples)
+        self.zone_ids = None
+        self.version = 0
+        self.recomputed = {node: 0 for node in NODES}
+        self.memory_budget = memory_budget
+        self.state_key = None
+        self._shared = False
+        self.evictions = 0
+        self._inputs = {}
+        self._derived = OrderedDict()   # name -> (key, value, bytes)
+        self.lock = threading.Lock()
+
+    # ---- CHANGE DETECTION ----
+    def _dirty_zones(self, node, settings, params):
+        # Returns one flag per zone plus a trailing NO_ZONE slot
+        dirty = np.ones(len(params), dtype=bool)
+        prev = self._inputs.get(node)
+        if prev is None or prev[0] != settings or prev[1].shape[1] != params.shape[1]:
+            return dirty
+        old, new = prev[1][:-1], params[:-1]
+        common = min(len(old), len(new))
+        dirty[:common] = ~_rows_equal(old[:common], new[:common])
+        dirty[-1] = False
+        return dirty
+
+    # ---- UPDATE ----
+    def update(self, zone_ids, zone_df,
+               vsh_method="Linear", porosity_method="Density", sw_method="Archie",
+               vsh_cutoff=0.4, phi_cutoff=0.10, sw_cutoff=0.6, progress=None):
+        # progress(node, samples done, samples to do) is called after every block
+        check_methods(vsh_method, porosity_method, sw_method)
+        zone_ids = np.asarray(zone_ids)
+        table = zone_param_table(zone_df)
+
+        if self.zone_ids is None:
+            moved = np.ones(self.n_samples, dtype=bool)
+        else:
+            moved = self.zone_ids != zone_ids
+        self.zone_ids = zone_ids.copy()
+        any_moved = moved.any()
+        positions_none = np.empty(0, dtype=np.intp)
+
+        settings = {
+            "Vsh": (vsh_method,),
+            "PHIT": (porosity_method,),
+            "PHIE": (),
+            "Sw": (sw_method,),
+            "Net": (vsh_cutoff, phi_cutoff, sw_cutoff),
+        }
+        methods = {"Vsh": vsh_method, "PHIT": porosity_method, "Sw": sw_method,
+                   "cutoffs": (vsh_cutoff, phi_cutoff, sw_cutoff)}
+
+        dirty_zones = {}
+        new_inputs = {}
+        try:
+            for node in NODES:
+                keys = stage_params(node, sw_method)
+                params = np.column_stack([table[k] for k in keys]) if keys else np.empty((len(zone_df) + 1, 0))
+                dirty = self._dirty_zones(node, settings[node], params)
+                for up in UPSTREAM[node]:
+                    dirty |= dirty_zones[up]
+                dirty_zones[node] = dirty
+                new_inputs[node] = (settings[node], params)
+
+                if dirty.all():
+                    positions = np.arange(self.n_samples)
+                elif dirty.any() or any_moved:
+                    # zone id -1 indexes the trailing NO_ZONE slot
+                    positions = np.flatnonzero(dirty[zone_ids] | moved)
+                else:
+                    positions = positions_none
+                self.recomputed[node] = len(positions)
+                if self._shared and len(positions):
+                    self._unshare()
+                self._run(node, positions, table, keys, methods, progress)
+        except Exception:
+            # Leave nothing half-cached, the next update starts from scratch
+            self._inputs = {}
+            self.zone_ids = None
+            self.state_key = None
+            raise
+
+        self._inputs.update(new_inputs)
+        if any(self.recomputed.values()):
+            self.version += 1
+            self.state_key = None
+        return self.results
+
+    # ---- SHARING BETWEEN SESSIONS ----
+    def snapshot(self, key):
+        self._shared = True
+        self.state_key = key
+        for values in self.results.values():
+            values.flags.writeable = False
+        return {"key": key, "results": self.results, "zone_ids": self.zone_ids, "inputs": dict(self._inputs)}
+
+    def restore(self, snapshot):
+        if len(snapshot["zone_ids"]) != self.n_samples:
+            raise ValueError("Snapshot was taken on a different dataset")
+        self.results = dict(snapshot["results"])
+        self.zone_ids = snapshot["zone_ids"]
+        self._inputs = dict(snapshot["inputs"])
+        self._shared = True
+        self.state_key = snapshot["key"]
+        self.recomputed = {node: 0 for node in NODES}
+        self.version += 1
+
+    def _unshare(self):
+        self.results = {name: values.copy() for name, values in self.results.items()}
+        self._shared = False
+
+    def _run(self, node, positions, table, keys, methods, progress=None):
+        n = len(positions)
+        full = n == self.n_samples
+        with np.errstate(all="ignore"):
+            for start in range(0, n, BLOCK):
+                if full:
+                    idx = slice(start, min(start + BLOCK, n))
+                else:
+                    idx = positions[start:start + BLOCK]
+                self._compute(node, idx, table, keys, methods, in_place=full)
+                if progress:
+                    progress(node, min(start + BLOCK, n), n)
+
+    def _compute(self, node, idx, table, keys, methods, in_place):
+        curves, res = self.curves, self.results
+        ids = self.zone_ids[idx]
+        p = {k: table[k][ids] for k in keys}
+        k = len(ids)
+        out = res[node][idx] if in_place else np.empty(k, dtype=res[node].dtype)
+        tmp = np.empty(k)
+
+        if node == "Vsh":
+            vsh_stage(curves["GR"][idx], p, methods["Vsh"], out, tmp)
+        elif node == "PHIT":
+            phit_stage(curves["RHOB"][idx], curves["NPHI"][idx], p, methods["PHIT"], out, tmp)
+        elif node == "PHIE":
+            phie_stage(res["PHIT"][idx], res["Vsh"][idx], out, tmp)
+        elif node == "Sw":
+            sw_stage(curves["RT"][idx], res["PHIE"][idx], res["Vsh"][idx], p, methods["Sw"], out, tmp, np.empty(k))
+        else:
+            net_stage(res["Vsh"][idx], res["PHIE"][idx], res["Sw"][idx], *methods["cutoffs"], out)
+
+        if not in_place:
+            res[node][idx] = out
+
+    # ---- DOWNSTREAM PRODUCTS (e.g. the zone summary) ----
+    def derived(self, name, key, build, uses_results=True):
+        # Rebuilt only when a curve node changed (if it reads the results)
+        # or the caller's key changed
+        key = (self.version if uses_results else None, key)
+        hit = self._derived.get(name)
+        if hit is not None and hit[0] == key:
+            self._derived.move_to_end(name)
+            return hit[1]
+        self._derived.pop(name, None)
+        value = build()
+        self._derived[name] = (key, value, sizeof(value))
+        self._enforce_budget()
+        return value
+
+    @property
+    def nbytes(self):
+        owned = sum(values.nbytes for values in self.results.values())
+        owned += self.zone_ids.nbytes if self.zone_ids is not None else 0
+        return owned + sum(entry[2] for entry in self._derived.values())
+
+    def _enforce_budget(self):
+        # The product just built is last in line and always kept
+        while len(self._derived) > 1 and self.nbytes > self.memory_budget:
+            self._derived.popitem(last=False)
+            self.evictions += 1
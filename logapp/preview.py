@@ -0,0 +1,54 @@
+# ============================================================
+# PAGINATED PREVIEW & COLUMN STATISTICS
+# ============================================================
+# The input tab shows one page of rows at a time, cut straight from the
+# (memory-mapped) curves, so only the visible window and the selected
+# columns are ever turned into a DataFrame and sent to the browser.
+# Column statistics are computed once per dataset in row chunks, which
+# keeps memory flat on wells that do not fit in RAM.
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [50, 100, 500, 1000]
+STATS_CHUNK = 1 << 20
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def depth_page(depth, value, page_size):
+    # Page holding the first sample at or below value
+    row = int(np.searchsorted(depth, value, side="left"))
+    return min(row, len(depth) - 1) // page_size + 1 if len(depth) else 1
+
+
+def page_window(curves, page, page_size, columns=None):
+    # Rows of one page (1-based) as a DataFrame indexed by sample number
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(curves))
+    return curves.frame(slice(start, stop), columns).set_axis(pd.RangeIndex(start, stop))
+
+
+def column_stats(curves, chunk_rows=STATS_CHUNK):
+    # min / max / mean / null count of every numeric column, one chunked pass each
+    rows = {}
+    n = len(curves)
+    for name in curves.numeric_columns():
+        values = curves[name]
+        lo, hi, total, count = np.inf, -np.inf, 0.0, 0
+        for start in range(0, n, chunk_rows):
+            chunk = np.asarray(values[start:start + chunk_rows], dtype=float)
+            finite = chunk[~np.isnan(chunk)]
+            if len(finite):
+                lo, hi = min(lo, finite.min()), max(hi, finite.max())
+                total += finite.sum()
+                count += len(finite)
+        rows[name] = {
+            "Min": lo if count else np.nan,
+            "Max": hi if count else np.nan,
+            "Mean": total / count if count else np.nan,
+            "Nulls": n - count,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
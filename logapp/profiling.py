@@ -0,0 +1,155 @@
+# ============================================================
+# OPT-IN STAGE PROFILER
+# ============================================================
+# Wall time, CPU time and peak Python/numpy memory per named stage of a
+# page run. Memory comes from tracemalloc, whose peak is process-wide:
+# memory-traced stages therefore run one at a time across all sessions
+# (behind _memory_lock), each switching tracing on and off in a
+# try/finally, so a run cut short by st.rerun() never leaves it on and
+# no session resets another's peak. The peak still includes what job
+# threads allocate meanwhile. Tracing slows every thread while it is on,
+# and the lock serialises profiled sessions: for timings alone under
+# production load, use trace_memory=False. CPU is the running thread's
+# time, so concurrent sessions don't pollute each other.
+#
+# The page "watches" its widget values; comparing their fingerprints
+# with the previous run tells which widget triggered the rerun. Each run
+# is appended as one JSON line to LOGAPP_PROFILE_LOG.
+
+import hashlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+PROFILE_LOG = os.environ.get("LOGAPP_PROFILE_LOG", ".logapp_profile.jsonl")
+HISTORY = 50
+
+_memory_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def fingerprint(value):
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.blake2b(repr(list(value.columns)).encode(), digest_size=8)
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=8).hexdigest()
+    file_id = getattr(value, "file_id", None)
+    if file_id is not None:
+        return str(file_id)
+    return repr(value)
+
+
+class SessionProfile:
+    # Rerun counter, last inputs and recent runs of one session (kept in st.session_state)
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.reruns = 0
+        self.inputs = {}
+        self.history = deque(maxlen=HISTORY)
+
+
+class StageProfiler:
+    def __init__(self, enabled=False, page="", trace_memory=True):
+        self.enabled = enabled
+        self.page = page
+        self.stages = []
+        self.inputs = {}
+        self._tracing = enabled and trace_memory
+        self._in_traced = False
+        self._start = (time.perf_counter(), time.thread_time())
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        # A stage nested in a memory-traced one is only timed
+        traced = self._tracing and not self._in_traced
+        if traced:
+            _memory_lock.acquire()
+            self._in_traced = True
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            peak = None
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                if started:
+                    tracemalloc.stop()
+                self._in_traced = False
+                _memory_lock.release()
+            self.stages.append({
+                "stage": name,
+                "wall_s": wall,
+                "cpu_s": cpu,
+                "peak_mb": peak / 2**20 if peak is not None else None,
+            })
+
+    def watch(self, **values):
+        if self.enabled:
+            self.inputs.update({name: fingerprint(value) for name, value in values.items()})
+
+    def finish(self, session, log_path=PROFILE_LOG):
+        # Closes the run; returns its record (None when disabled)
+        if not self.enabled:
+            return None
+        session.reruns += 1
+        changed = [name for name, value in self.inputs.items() if session.inputs.get(name) != value]
+        first_run = not session.inputs
+        session.inputs = dict(self.inputs)
+
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "session": session.session_id,
+            "page": self.page,
+            "rerun": session.reruns,
+            "trigger": ["(first run)"] if first_run else changed or ["(no widget change)"],
+            "wall_s": time.perf_counter() - self._start[0],
+            "cpu_s": time.thread_time() - self._start[1],
+            "stages": self.stages,
+        }
+        session.history.append(record)
+        if log_path:
+            append_log(record, log_path)
+        return record
+
+    def frame(self):
+        return pd.DataFrame(self.stages, columns=["stage", "wall_s", "cpu_s", "peak_mb"])
+
+
+def append_log(record, path=PROFILE_LOG):
+    line = json.dumps(record, default=str) + "\n"
+    with _log_lock:
+        with open(path, "a") as fh:
+            fh.write(line)
+
+
+def read_log(path=PROFILE_LOG):
+    # One row per stage per run, for offline analysis of a production log
+    rows = []
+    with open(path) as fh:
+        for line in fh:
+            record = json.loads(line)
+            for stage in record["stages"]:
+                rows.append({key: record[key] for key in ["timestamp", "session", "page", "rerun"]}
+                            | {"trigger": ", ".join(record["trigger"])} | stage)
+    return pd.DataFrame(rows)
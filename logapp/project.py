@@ -0,0 +1,400 @@
+# ============================================================
+# PERSISTENT PROJECT STORE (SQLite)
+# ============================================================
+# One SQLite file holds the project: wells, their curves, the zone
+# tables and parameter sets used on them, and evaluation results with
+# their zone summary. Zone tables and parameter sets are versioned (a new
+# row only when something changed), so reopening a well brings back the
+# last table and settings, and the evaluation stored for exactly those
+# inputs is restored into the graph instead of being recomputed.
+#
+# Curves and result curves are stored as blocks of BLOCK_ROWS samples,
+# each tagged with the depth range it covers and indexed by
+# (series, depth), so a depth window reads only the blocks it overlaps
+# and a cross-well window is one indexed lookup per well.
+#
+# Every call opens its own connection (the store is shared by sessions
+# and job threads); WAL mode lets readers run while a save is written.
+#
+# A well name holding other curves is never overwritten unless the
+# caller asks for it (save_well(..., replace=True)). Everything read
+# back from the file is plain JSON or raw array bytes, never pickles.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .curves import DEPTH_COL
+
+PROJECT_DB = os.environ.get("LOGAPP_PROJECT", ".logapp_project.sqlite")
+BLOCK_ROWS = 1 << 16
+# Older evaluations of a well are dropped beyond this many
+KEEP_EVALUATIONS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wells (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    field TEXT,
+    dataset_key TEXT,
+    n_samples INTEGER,
+    top REAL,
+    base REAL,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS zone_tables (
+    id INTEGER PRIMARY KEY,
+    well_id INTEGER NOT NULL REFERENCES wells(id) ON DELETE CASCADE,
+    saved REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS zone_tables_well ON zone_tables(well_id, id);
+CREATE TABLE IF NOT EXISTS parameter_sets (
+    id INTEGER PRIMARY KEY,
+    well_id INTEGER NOT NULL REFERENCES wells(id) ON DELETE CASCADE,
+    saved REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parameter_sets_well ON parameter_sets(well_id, id);
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY,
+    well_id INTEGER NOT NULL REFERENCES wells(id) ON DELETE CASCADE,
+    dataset_key TEXT,
+    zone_table_id INTEGER REFERENCES zone_tables(id),
+    parameter_set_id INTEGER REFERENCES parameter_sets(id),
+    created REAL,
+    state TEXT NOT NULL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS evaluations_well ON evaluations(well_id, id);
+-- One row per stored curve: input curves have no evaluation, result curves do
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    well_id INTEGER NOT NULL REFERENCES wells(id) ON DELETE CASCADE,
+    evaluation_id INTEGER REFERENCES evaluations(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    dtype TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS series_well ON series(well_id, evaluation_id, name);
+CREATE TABLE IF NOT EXISTS blocks (
+    series_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    block INTEGER NOT NULL,
+    top REAL NOT NULL,
+    base REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (series_id, block)
+);
+CREATE INDEX IF NOT EXISTS blocks_depth ON blocks(series_id, base, top);
+"""
+
+
+class WellExistsError(ValueError):
+    def __init__(self, name):
+        super().__init__(f"Well {name!r} in the project holds other curves")
+        self.name = name
+
+
+def _block_ranges(depth, block_rows=BLOCK_ROWS):
+    # (block, start, stop, top depth, base depth) over a depth-ordered curve
+    for block, start in enumerate(range(0, len(depth), block_rows)):
+        stop = min(start + block_rows, len(depth))
+        yield block, start, stop, float(depth[start]), float(depth[stop - 1])
+
+
+class ProjectStore:
+    def __init__(self, path=PROJECT_DB, block_rows=BLOCK_ROWS):
+        self.path = path
+        self.block_rows = block_rows
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---- WELLS ----
+    def _well_id(self, conn, name, create=False):
+        row = conn.execute("SELECT id FROM wells WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return conn.execute("INSERT INTO wells (name, updated) VALUES (?, ?)", (name, time.time())).lastrowid
+
+    def wells(self):
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT w.name, w.field, w.n_samples, w.top, w.base, COUNT(e.id), MAX(e.created), w.updated
+                FROM wells w LEFT JOIN evaluations e ON e.well_id = w.id
+                GROUP BY w.id ORDER BY w.name""").fetchall()
+        df = pd.DataFrame(rows, columns=["Well", "Field", "Samples", "Top", "Base", "Evaluations",
+                                         "Last Evaluated", "Updated"])
+        for col in ["Last Evaluated", "Updated"]:
+            df[col] = pd.to_datetime(df[col], unit="s")
+        return df
+
+    def delete_well(self, name):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM wells WHERE name = ?", (name,))
+
+    # ---- CURVES ----
+    def _write_series(self, conn, well_id, evaluation_id, name, values, depth):
+        values = np.asarray(values)
+        series_id = conn.execute(
+            "INSERT INTO series (well_id, evaluation_id, name, dtype) VALUES (?, ?, ?, ?)",
+            (well_id, evaluation_id, name, values.dtype.str)).lastrowid
+        conn.executemany(
+            "INSERT INTO blocks (series_id, block, top, base, data) VALUES (?, ?, ?, ?, ?)",
+            ((series_id, block, top, base, np.ascontiguousarray(values[start:stop]).tobytes())
+             for block, start, stop, top, base in _block_ranges(depth, self.block_rows)))
+
+    def _read_series(self, conn, well_id, evaluation_id, names=None, top=None, base=None):
+        # name -> array over the blocks overlapping [top, base] (whole blocks, in depth order)
+        rows = conn.execute(
+            "SELECT id, name, dtype FROM series WHERE well_id = ? AND evaluation_id IS ? ORDER BY id",
+            (well_id, evaluation_id)).fetchall()
+        out = {}
+        for series_id, name, dtype in rows:
+            if names is not None and name not in names:
+                continue
+            blocks = conn.execute(
+                "SELECT data FROM blocks WHERE series_id = ? AND base >= ? AND top <= ? ORDER BY block",
+                (series_id, -np.inf if top is None else top, np.inf if base is None else base)).fetchall()
+            out[name] = np.concatenate([np.frombuffer(data, dtype=dtype) for data, in blocks]) \
+                if blocks else np.empty(0, dtype=dtype)
+        return out
+
+    def dataset_key(self, name):
+        with self._connect() as conn:
+            row = conn.execute("SELECT dataset_key FROM wells WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def save_well(self, name, field, dataset_key, curves, replace=False):
+        # Curves are only rewritten when the dataset changed; returns True if they were.
+        # Other curves already stored under this name are kept unless replace is set.
+        depth = np.asarray(curves[DEPTH_COL])
+        with self._connect() as conn:
+            well_id = self._well_id(conn, name, create=True)
+            stored_key, = conn.execute("SELECT dataset_key FROM wells WHERE id = ?", (well_id,)).fetchone()
+            conn.execute("UPDATE wells SET field = ?, updated = ? WHERE id = ?", (field, time.time(), well_id))
+            if stored_key == dataset_key:
+                return False
+            if stored_key is not None and not replace:
+                raise WellExistsError(name)
+            # Results of the old curves no longer apply
+            conn.execute("DELETE FROM evaluations WHERE well_id = ?", (well_id,))
+            conn.execute("DELETE FROM series WHERE well_id = ?", (well_id,))
+            for col, values in curves.items():
+                self._write_series(conn, well_id, None, col, values, depth)
+            conn.execute("UPDATE wells SET dataset_key = ?, n_samples = ?, top = ?, base = ? WHERE id = ?",
+                         (dataset_key, len(depth), float(depth[0]) if len(depth) else None,
+                          float(depth[-1]) if len(depth) else None, well_id))
+        return True
+
+    def load_curves(self, name, top=None, base=None, columns=None):
+        # (dataset_key, curves) with curves trimmed to [top, base]; None for an unknown well
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, dataset_key FROM wells WHERE name = ?", (name,)).fetchone()
+            if row is None or row[1] is None:
+                return None
+            names = None if columns is None else {DEPTH_COL, *columns}
+            curves = self._read_series(conn, row[0], None, names, top, base)
+        return row[1], _trim(curves, curves[DEPTH_COL], top, base)
+
+    # ---- ZONE TABLES & PARAMETER SETS (new version only when changed) ----
+    def _save_version(self, table, name, data):
+        with self._connect() as conn:
+            well_id = self._well_id(conn, name, create=True)
+            row = conn.execute(f"SELECT id, data FROM {table} WHERE well_id = ? ORDER BY id DESC LIMIT 1",
+                               (well_id,)).fetchone()
+            if row is not None and row[1] == data:
+                return row[0]
+            return conn.execute(f"INSERT INTO {table} (well_id, saved, data) VALUES (?, ?, ?)",
+                                (well_id, time.time(), data)).lastrowid
+
+    def _load_version(self, table, name):
+        with self._connect() as conn:
+            row = conn.execute(f"""
+                SELECT t.data FROM {table} t JOIN wells w ON w.id = t.well_id
+                WHERE w.name = ? ORDER BY t.id DESC LIMIT 1""", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def save_zones(self, name, zone_df):
+        return self._save_version("zone_tables", name, _frame_json(zone_df))
+
+    def load_zones(self, name):
+        data = self._load_version("zone_tables", name)
+        if data is None:
+            return None
+        return _frame(data)
+
+    def save_parameters(self, name, settings):
+        return self._save_version("parameter_sets", name, json.dumps(settings, sort_keys=True))
+
+    def load_parameters(self, name):
+        data = self._load_version("parameter_sets", name)
+        return None if data is None else json.loads(data)
+
+    # ---- EVALUATIONS ----
+    def save_evaluation(self, name, snapshot, summary_df=None):
+        # Stores an EvaluationGraph snapshot against the well's stored curves
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, dataset_key FROM wells WHERE name = ?", (name,)).fetchone()
+            if row is None or row[1] is None:
+                raise KeyError(f"Well {name!r} has no stored curves")
+            well_id, dataset_key = row
+            depth = self._read_series(conn, well_id, None, {DEPTH_COL})[DEPTH_COL]
+            if len(depth) != len(snapshot["zone_ids"]):
+                raise ValueError("Snapshot was taken on a different dataset")
+            latest = [conn.execute(f"SELECT MAX(id) FROM {table} WHERE well_id = ?", (well_id,)).fetchone()[0]
+                      for table in ("zone_tables", "parameter_sets")]
+            state = _state_json(snapshot["key"], snapshot["inputs"])
+            evaluation_id = conn.execute(
+                "INSERT INTO evaluations (well_id, dataset_key, zone_table_id, parameter_set_id, created, state, summary)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (well_id, dataset_key, *latest, time.time(), state,
+                 None if summary_df is None else _frame_json(summary_df))).lastrowid
+            for col, values in {**snapshot["results"], "zone_ids": snapshot["zone_ids"]}.items():
+                self._write_series(conn, well_id, evaluation_id, col, values, depth)
+            conn.execute("""
+                DELETE FROM evaluations WHERE well_id = ? AND id NOT IN
+                (SELECT id FROM evaluations WHERE well_id = ? ORDER BY id DESC LIMIT ?)""",
+                         (well_id, well_id, KEEP_EVALUATIONS))
+        return evaluation_id
+
+    def _find_evaluation(self, conn, name, key):
+        # (well id, evaluation id, state) of the newest evaluation with this key (any key if None)
+        rows = conn.execute("""
+            SELECT w.id, e.id, e.state FROM evaluations e JOIN wells w ON w.id = e.well_id
+            WHERE w.name = ? AND e.dataset_key = w.dataset_key ORDER BY e.id DESC""", (name,))
+        for well_id, evaluation_id, state in rows:
+            try:
+                state = _state(state)
+            except (TypeError, ValueError):
+                # Unreadable (or written by an older version): treated as not stored
+                continue
+            if key is None or state["key"] == key:
+                return well_id, evaluation_id, state
+        return None
+
+    def has_evaluation(self, name, key):
+        with self._connect() as conn:
+            return self._find_evaluation(conn, name, key) is not None
+
+    def load_evaluation(self, name, key=None):
+        # Snapshot (for EvaluationGraph.restore) plus "summary", or None
+        with self._connect() as conn:
+            found = self._find_evaluation(conn, name, key)
+            if found is None:
+                return None
+            well_id, evaluation_id, state = found
+            results = self._read_series(conn, well_id, evaluation_id)
+            summary, = conn.execute("SELECT summary FROM evaluations WHERE id = ?", (evaluation_id,)).fetchone()
+        zone_ids = results.pop("zone_ids")
+        return {**state, "results": results, "zone_ids": zone_ids,
+                "summary": None if summary is None else _frame(summary)}
+
+    # ---- QUERIES ----
+    def window(self, top, base, columns=None, wells=None):
+        # Curves and latest results of every (or the given) well between top and base, one frame
+        frames = []
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, name FROM wells WHERE dataset_key IS NOT NULL ORDER BY name").fetchall()
+            for well_id, name in rows:
+                if wells is not None and name not in wells:
+                    continue
+                names = None if columns is None else {DEPTH_COL, *columns}
+                curves = self._read_series(conn, well_id, None, names, top, base)
+                latest = conn.execute("""
+                    SELECT e.id FROM evaluations e JOIN wells w ON w.id = e.well_id
+                    WHERE w.id = ? AND e.dataset_key = w.dataset_key ORDER BY e.id DESC LIMIT 1""",
+                                      (well_id,)).fetchone()
+                if latest is not None:
+                    results = self._read_series(conn, well_id, latest[0], names, top, base)
+                    results.pop("zone_ids", None)
+                    curves.update(results)
+                curves = _trim(curves, curves[DEPTH_COL], top, base)
+                frames.append(pd.DataFrame(curves).assign(Well=name))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def summaries(self):
+        # Well -> zone summary of its latest evaluation
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT w.name, e.summary FROM evaluations e JOIN wells w ON w.id = e.well_id
+                WHERE e.id IN (SELECT MAX(id) FROM evaluations GROUP BY well_id)
+                AND e.summary IS NOT NULL ORDER BY w.name""").fetchall()
+        return {name: _frame(summary) for name, summary in rows}
+
+
+def _plain(value):
+    # numpy scalars in evaluation keys and settings
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _tuples(value):
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def _state_json(key, inputs):
+    # Evaluation key and graph inputs (per node: settings, zone parameter rows) as JSON
+    return json.dumps({"key": key,
+                       "inputs": {node: [settings, params.tolist(), params.shape[1]]
+                                  for node, (settings, params) in inputs.items()}}, default=_plain)
+
+
+def _state(data):
+    state = json.loads(data)
+    inputs = {node: (_tuples(settings), np.array(params, dtype=float).reshape(len(params), width))
+              for node, (settings, params, width) in state["inputs"].items()}
+    return {"key": _tuples(state["key"]), "inputs": inputs}
+
+
+def _frame_json(df):
+    # Python's float repr round-trips exactly, so restored zone tables give the same evaluation key
+    return json.dumps(df.to_dict(orient="split", index=False))
+
+
+def _frame(data):
+    return pd.DataFrame(**json.loads(data))
+
+
+def _trim(curves, depth, top, base):
+    if top is None and base is None:
+        return curves
+    keep = np.ones(len(depth), dtype=bool)
+    if top is not None:
+        keep &= depth >= top
+    if base is not None:
+        keep &= depth <= base
+    return {name: values[keep] for name, values in curves.items()}
+
+
+# One store per server process, shared by every session
+_project_store = None
+_project_lock = threading.Lock()
+
+
+def project_store():
+    global _project_store
+    with _project_lock:
+        if _project_store is None:
+            _project_store = ProjectStore()
+        return _project_store
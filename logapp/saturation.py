@@ -0,0 +1,99 @@
+# ============================================================
+# SHALY-SAND WATER SATURATION SOLVERS
+# ============================================================
+# Full-form Simandoux and Indonesian equations on whole arrays. Every
+# parameter may be a scalar or a per-sample array. Each solver returns
+# (sw, ok): sw is NOT clipped, and ok is False where an input is missing,
+# the iteration did not converge or the root is outside [0, 1], so
+# non-physical samples can be reported instead of hidden by the clip.
+#
+#   Simandoux:   1/Rt  = phi^m Sw^n / (a Rw) + Vsh Sw / Rsh
+#   Indonesian:  1/√Rt = (Vsh^(1 - Vsh/2) / √Rsh + phi^(m/2) / √(a Rw)) Sw^(n/2)
+#
+# Simandoux is a quadratic in Sw for n = 2 and is solved with the stable
+# root formula; other n go through a bracketed Newton iteration that
+# falls back to bisection. Indonesian factors out Sw^(n/2) and has an
+# exact root for any n.
+
+import numpy as np
+
+SW_TOL = 1e-10
+MAX_ITER = 60
+
+
+def _physical(sw, ok=True):
+    return ok & np.isfinite(sw) & (sw >= 0) & (sw <= 1)
+
+
+def solve_power_sum(A, B, C, n, x0=None, tol=SW_TOL, max_iter=MAX_ITER):
+    # Positive root of A·S^n + B·S = C for A, B >= 0, C > 0: returns (S, converged)
+    A, B, C, n = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (A, B, C, n)))
+    # Each term alone bounds the root from above: [0, hi] always brackets it
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        hi = np.fmin((C / A) ** (1 / n), C / B)
+    x = hi.copy()
+    if x0 is not None:
+        x0 = np.broadcast_to(np.asarray(x0, dtype=float), x.shape)
+        inside = (x0 > 0) & (x0 < hi)
+        x[inside] = x0[inside]
+    converged = np.zeros(x.shape, dtype=bool)
+    active = np.flatnonzero(np.isfinite(hi) & (A >= 0) & (B >= 0) & (C >= 0) & (n > 0))
+
+    lo = np.zeros(len(active))
+    up = hi[active]
+    a, b, c, k, xa = A[active], B[active], C[active], n[active], x[active]
+    done = np.zeros(len(active), dtype=bool)
+    with np.errstate(all="ignore"):
+        for _ in range(max_iter):
+            if not len(active):
+                break
+            power = xa ** (k - 1)
+            f = (a * power + b) * xa - c
+            np.copyto(lo, xa, where=f < 0)
+            np.copyto(up, xa, where=f > 0)
+            new = xa - f / (k * a * power + b)
+            done = (np.abs(new - xa) <= tol * np.maximum(new, 1.0)) | (f == 0)
+            # Newton steps that leave the bracket (or are undefined) become bisection steps
+            new = np.where(done | ((new >= lo) & (new <= up)), new, 0.5 * (lo + up))
+            xa = new
+            n_done = np.count_nonzero(done)
+            # Shrinking the working set costs a copy of every array, so wait for a good share
+            if n_done * 4 >= len(active) or n_done == len(active):
+                x[active] = xa
+                converged[active[done]] = True
+                keep = ~done
+                active, lo, up, a, b, c, k, xa, done = (
+                    v[keep] for v in (active, lo, up, a, b, c, k, xa, done))
+        x[active] = xa
+        converged[active[done]] = True
+    return x, converged
+
+
+def sw_simandoux_full(rt, rw, phi, vsh, a=1.0, m=2.0, n=2.0, rsh=2.0):
+    rt, rw, phi, vsh, a, m, n, rsh = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (rt, rw, phi, vsh, a, m, n, rsh)))
+    shape = rt.shape
+    # Worked on flat 1-D arrays so scalar (and 2-D) inputs can be indexed by sample
+    rt, rw, phi, vsh, a, m, n, rsh = (np.ravel(v) for v in (rt, rw, phi, vsh, a, m, n, rsh))
+    with np.errstate(all="ignore"):
+        A = phi ** m / (a * rw)
+        B = vsh / rsh
+        C = 1 / rt
+        # n = 2: root of A·S² + B·S - C written without the cancellation of -B + √(B² + 4AC)
+        sw = 2 * C / (B + np.sqrt(B * B + 4 * A * C))
+    ok = np.isfinite(sw)
+    general = np.flatnonzero(n != 2)
+    if len(general):
+        # The n = 2 root is a close starting point
+        sw[general], ok[general] = solve_power_sum(A[general], B[general], C[general], n[general],
+                                                   x0=sw[general])
+    return sw.reshape(shape), _physical(sw, ok).reshape(shape)
+
+
+def sw_indonesian_full(rt, rw, phi, vsh, a=1.0, m=2.0, n=2.0, rsh=2.0):
+    with np.errstate(all="ignore"):
+        shale = vsh ** (1 - 0.5 * vsh) / np.sqrt(rsh)
+        clean = phi ** (0.5 * m) / np.sqrt(a * rw)
+        sw = (1 / (np.sqrt(rt) * (shale + clean))) ** (2 / n)
+    sw = np.asarray(sw, dtype=float)
+    return sw, _physical(sw)
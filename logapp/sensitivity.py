@@ -0,0 +1,81 @@
+# ============================================================
+# CUTOFF SENSITIVITY CUBE
+# ============================================================
+# Net thickness for every (Vsh, PHIE, Sw) cutoff triple of a grid, per
+# zone. Each sample is binned once by the first grid cutoff it passes
+# on each axis, its interval thickness is added to a (zone, Vsh, PHIE, Sw)
+# histogram, and cumulative sums along the three axes turn the histogram
+# into "thickness passing all three cutoffs". Cost is
+# O(samples + zones x grid) rather than O(samples x grid).
+#
+# The histogram has zones x (steps + 1)^3 cells, so the grid is capped
+# at MAX_CUBE_CELLS (max_steps() gives the finest grid allowed for a
+# zone count) and the sums run in place in float32.
+
+import numpy as np
+import pandas as pd
+
+# ~16 MB of float32 cube, 32 MB for the float64 histogram while it is built
+MAX_CUBE_CELLS = 4_000_000
+
+
+def cutoff_grid(lo, hi, n):
+    return np.linspace(lo, hi, int(n))
+
+
+def max_steps(n_zones, max_cells=MAX_CUBE_CELLS):
+    # Finest steps per cutoff whose cube fits in max_cells
+    return int(round((max_cells / max(n_zones, 1)) ** (1 / 3), 6)) - 1
+
+
+def net_cube(vsh, phie, sw, zone_ids, h, n_zones, vsh_grid, phi_grid, sw_grid, max_cells=MAX_CUBE_CELLS):
+    nv, npor, ns = len(vsh_grid), len(phi_grid), len(sw_grid)
+    shape = (n_zones, nv + 1, npor + 1, ns + 1)
+    if np.prod(shape, dtype=np.int64) > max_cells:
+        raise ValueError(f"Cutoff grid too fine for {n_zones} zones: "
+                         f"{nv} x {npor} x {ns} steps, at most {max_steps(n_zones, max_cells)} per cutoff")
+    valid = (np.asarray(zone_ids) >= 0) & ~(np.isnan(vsh) | np.isnan(phie) | np.isnan(sw))
+    z = np.asarray(zone_ids)[valid]
+
+    # Vsh / Sw: passes cutoff i for every i >= first index with grid >= value (nv = never)
+    iv = np.searchsorted(vsh_grid, vsh[valid], side="left")
+    i_s = np.searchsorted(sw_grid, sw[valid], side="left")
+    # PHIE: passes cutoff j for every j < number of grid values <= phie
+    jp = np.searchsorted(phi_grid, phie[valid], side="right")
+
+    flat = np.ravel_multi_index((z, iv, jp, i_s), shape)
+    hist = np.bincount(flat, weights=np.asarray(h)[valid], minlength=np.prod(shape))
+    hist = hist.astype(np.float32).reshape(shape)
+
+    # Running sums in place: Vsh upwards, PHIE downwards (reversed view), Sw upwards
+    np.cumsum(hist, axis=1, out=hist)
+    np.cumsum(hist[:, :, ::-1], axis=2, out=hist[:, :, ::-1])
+    np.cumsum(hist, axis=3, out=hist)
+    return np.ascontiguousarray(hist[:, :nv, 1:, :ns])
+
+
+def knee(x, y):
+    # Kneedle: the point farthest from the chord joining the curve's ends
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 3 or np.ptp(y) == 0:
+        return np.nan
+    xn = (x - x[0]) / (x[-1] - x[0])
+    yn = (y - y[0]) / (y[-1] - y[0])
+    return float(x[np.argmax(np.abs(yn - xn))])
+
+
+def zone_knees(cube, zone_names, vsh_grid, phi_grid, sw_grid, vsh_cutoff, phi_cutoff, sw_cutoff):
+    # Knee of each cutoff's net-thickness curve with the other two held at the current cutoffs
+    iv = int(np.abs(vsh_grid - vsh_cutoff).argmin())
+    jp = int(np.abs(phi_grid - phi_cutoff).argmin())
+    i_s = int(np.abs(sw_grid - sw_cutoff).argmin())
+    rows = []
+    for zone, name in enumerate(zone_names):
+        rows.append({
+            "Zone Name": name,
+            "Knee Vsh Cutoff": knee(vsh_grid, cube[zone, :, jp, i_s]),
+            "Knee PHIE Cutoff": knee(phi_grid, cube[zone, iv, :, i_s]),
+            "Knee Sw Cutoff": knee(sw_grid, cube[zone, iv, jp, :]),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,113 @@
+# ============================================================
+# ZONE SUMMARY – ONE GROUPED REDUCTION OVER ZONE IDS
+# ============================================================
+# Every zone aggregate is a weighted bincount over the zone-id array,
+# so the cost is one pass over the samples whatever the zone count.
+# Each sample stands for the depth interval between the midpoints to its
+# neighbours, which keeps thicknesses right on irregularly sampled logs.
+# The sums are kept in a ZoneAccumulator so a well can also be fed in
+# depth-ordered chunks (out-of-core evaluation) with the same result.
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_FORMAT = {
+    "Gross Thickness": "{:.2f}",
+    "Net Thickness": "{:.2f}",
+    "Net-to-Gross (NTG)": "{:.2f}",
+    "Avg Vsh": "{:.2f}",
+    "Avg PHIE": "{:.2f}",
+    "Avg Sw": "{:.2f}",
+    "Net PHIE (h-wtd)": "{:.3f}",
+    "Net Sw (PV-wtd)": "{:.3f}",
+    "PHIE·h": "{:.3f}",
+    "HCPT": "{:.3f}",
+}
+
+
+def sample_intervals(depth):
+    depth = np.asarray(depth, dtype=float)
+    if len(depth) < 2:
+        return np.zeros(len(depth))
+    edges = np.empty(len(depth) + 1)
+    edges[1:-1] = 0.5 * (depth[1:] + depth[:-1])
+    edges[0] = depth[0] - 0.5 * (depth[1] - depth[0])
+    edges[-1] = depth[-1] + 0.5 * (depth[-1] - depth[-2])
+    return np.diff(edges)
+
+
+def chunk_intervals(depth, start, stop):
+    # Intervals of depth[start:stop] as if computed on the whole curve
+    lo, hi = max(start - 1, 0), min(stop + 1, len(depth))
+    h = sample_intervals(np.asarray(depth[lo:hi], dtype=float))
+    return h[start - lo:start - lo + stop - start]
+
+
+class ZoneAccumulator:
+    # Running per-zone sums; add() sample chunks in any order, then summary()
+    def __init__(self, n_zones):
+        self.n_zones = n_zones
+        self.counts = np.zeros(n_zones, dtype=np.int64)
+        self.sums = {name: np.zeros(n_zones) for name in [
+            "net_h", "phi_h", "hc_phi_h", "Vsh", "Vsh_n", "PHIE", "PHIE_n", "Sw", "Sw_n"]}
+
+    def add(self, zone_ids, results, h):
+        n_zones = self.n_zones
+        # Shift so NO_ZONE (-1) lands in bin 0, which is dropped
+        bins = np.asarray(zone_ids, dtype=np.intp) + 1
+
+        def total(weights):
+            return np.bincount(bins, weights=weights, minlength=n_zones + 1)[1:]
+
+        for name in ["Vsh", "PHIE", "Sw"]:
+            values = results[name]
+            valid = ~np.isnan(values)
+            self.sums[name] += total(np.where(valid, values, 0.0))
+            self.sums[name + "_n"] += total(valid.astype(float))
+
+        phie, sw = results["PHIE"], results["Sw"]
+        net = np.asarray(results["Net"], dtype=bool)
+        h_net = np.where(net, h, 0.0)
+        phi_h = h_net * np.where(net, phie, 0.0)
+        hc_phi_h = phi_h * np.where(net, 1.0 - sw, 0.0)
+
+        self.counts += np.bincount(bins, minlength=n_zones + 1)[1:]
+        self.sums["net_h"] += total(h_net)
+        self.sums["phi_h"] += total(phi_h)
+        self.sums["hc_phi_h"] += total(hc_phi_h)
+
+    def summary(self, zone_df):
+        sums = self.sums
+        net_thickness = sums["net_h"]
+        pore_thickness = sums["phi_h"]
+        hc_pore_thickness = sums["hc_phi_h"]
+        top = zone_df["Top Depth"].to_numpy(dtype=float)
+        base = zone_df["Base Depth"].to_numpy(dtype=float)
+        gross = base - top
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            summary = pd.DataFrame({
+                "Zone Name": zone_df["Zone Name"].to_numpy(),
+                "Top Depth": top,
+                "Bottom Depth": base,
+                "Gross Thickness": gross,
+                "Net Thickness": net_thickness,
+                "Net-to-Gross (NTG)": np.where(gross > 0, net_thickness / np.where(gross > 0, gross, 1), 0.0),
+                "Avg Vsh": sums["Vsh"] / sums["Vsh_n"],
+                "Avg PHIE": sums["PHIE"] / sums["PHIE_n"],
+                "Avg Sw": sums["Sw"] / sums["Sw_n"],
+                "Net PHIE (h-wtd)": pore_thickness / net_thickness,
+                "Net Sw (PV-wtd)": 1.0 - hc_pore_thickness / pore_thickness,
+                "PHIE·h": pore_thickness,
+                "HCPT": hc_pore_thickness,
+            })
+        # Zones without samples are left out, as before
+        return summary[self.counts > 0].reset_index(drop=True)
+
+
+def zone_summary(depth, zone_ids, results, zone_df, h=None):
+    if h is None:
+        h = sample_intervals(depth)
+    acc = ZoneAccumulator(len(zone_df))
+    acc.add(zone_ids, results, h)
+    return acc.summary(zone_df)
@@ -0,0 +1,88 @@
+# ============================================================
+# SEEDED SYNTHETIC WELL GENERATOR
+# ============================================================
+# Layered sand / shale / carbonate logs with a matching zone table, for
+# demos and benchmarks. Each zone has its own matrix, clean/shale GR,
+# porosity level, Rw and (maybe) a hydrocarbon column above a contact;
+# beds inside a zone vary in shale volume and porosity, and every curve
+# is forward-modelled from those (RHOB and NPHI from volumes, RT from
+# the Simandoux equation, PE from the matrix mix). The same seed always
+# gives the same well.
+
+import numpy as np
+import pandas as pd
+
+from .zones import ZONE_DEFAULTS
+
+# name, matrix density, matrix PE
+MATRICES = [("sandstone", 2.65, 1.81), ("limestone", 2.71, 5.08), ("dolomite", 2.87, 3.14)]
+RHO_SHALE, PE_SHALE, NPHI_SHALE, R_SHALE = 2.45, 3.42, 0.35, 2.0
+BEDS_PER_ZONE = 8
+
+
+def _smooth_noise(rng, n, width=15):
+    # Correlated noise with unit-ish amplitude (moving average of white noise)
+    white = rng.standard_normal(n + width)
+    csum = np.cumsum(white)
+    return (csum[width:] - csum[:-width]) / np.sqrt(width)
+
+
+def synthetic_well(n_samples=10_000, n_zones=3, seed=0, top=1000.0, base=None):
+    # Returns (well_df with Depth, GR, RHOB, NPHI, RT, PE; zone_df in the tab 1 layout)
+    rng = np.random.default_rng(seed)
+    base = top + 0.1 * (n_samples - 1) if base is None else base
+    depth = np.linspace(top, base, n_samples)
+
+    # ---- ZONES ----
+    bounds = top + (base - top) * np.concatenate([[0.0], np.cumsum(rng.dirichlet(np.full(n_zones, 4.0)))])
+    bounds[-1] = base
+    zone = np.clip(np.searchsorted(bounds, depth, side="right") - 1, 0, n_zones - 1)
+
+    matrix = rng.integers(0, len(MATRICES), n_zones)
+    rho_ma = np.array([MATRICES[i][1] for i in matrix])
+    pe_ma = np.array([MATRICES[i][2] for i in matrix])
+    gr_clean = rng.uniform(15, 35, n_zones)
+    gr_shale = rng.uniform(100, 150, n_zones)
+    phi_level = rng.uniform(0.08, 0.30, n_zones)
+    rw = rng.uniform(0.02, 0.10, n_zones)
+    sw_hc = rng.uniform(0.15, 0.45, n_zones)
+    # Contact as a fraction of the zone; > 1 means a fully hydrocarbon-bearing zone, < 0 all water
+    contact = bounds[:-1] + (bounds[1:] - bounds[:-1]) * rng.uniform(-0.3, 1.3, n_zones)
+
+    # ---- BEDS ----
+    n_beds = n_zones * BEDS_PER_ZONE
+    bed_tops = np.sort(rng.uniform(top, base, n_beds - 1))
+    bed = np.searchsorted(bed_tops, depth)
+    bed_vsh = rng.beta(0.6, 0.9, n_beds)
+    bed_phi_scale = rng.uniform(0.7, 1.1, n_beds)
+
+    # ---- VOLUMES ----
+    vsh = np.clip(bed_vsh[bed] + 0.05 * _smooth_noise(rng, n_samples), 0, 1)
+    phi = np.clip(phi_level[zone] * bed_phi_scale[bed] * (1 - vsh) + 0.01 * _smooth_noise(rng, n_samples), 0.005, 0.4)
+    sw = np.where(depth <= contact[zone], sw_hc[zone] + (1 - sw_hc[zone]) * 0.5 * vsh, 1.0)
+
+    # ---- LOGS ----
+    gr = gr_clean[zone] + vsh * (gr_shale[zone] - gr_clean[zone]) + rng.normal(0, 3, n_samples)
+    rho_fluid = 1.0 * sw + 0.8 * (1 - sw)
+    rhob = rho_ma[zone] * (1 - phi - vsh) + RHO_SHALE * vsh + rho_fluid * phi + rng.normal(0, 0.01, n_samples)
+    nphi = phi * (sw + 0.7 * (1 - sw)) + NPHI_SHALE * vsh + rng.normal(0, 0.005, n_samples)
+    conductivity = phi ** 2 * sw ** 2 / rw[zone] + vsh * sw / R_SHALE
+    rt = np.exp(rng.normal(0, 0.05, n_samples)) / conductivity
+    pe = pe_ma[zone] * (1 - vsh) + PE_SHALE * vsh + rng.normal(0, 0.05, n_samples)
+
+    well_df = pd.DataFrame({"Depth": depth, "GR": gr, "RHOB": rhob, "NPHI": nphi, "RT": rt, "PE": pe})
+
+    # Zones touch: a sample on a boundary belongs to the deeper zone
+    zone_df = pd.DataFrame({
+        "Zone Name": [f"Zone_{i+1}" for i in range(n_zones)],
+        "Top Depth": bounds[:-1],
+        "Base Depth": bounds[1:],
+        **{col: np.full(n_zones, value) for col, value in ZONE_DEFAULTS.items()},
+    })
+    zone_df["GR_clean"] = gr_clean
+    zone_df["GR_shale"] = gr_shale
+    zone_df["Matrix Density"] = rho_ma
+    zone_df["Shale Density"] = RHO_SHALE
+    zone_df["Rw"] = rw
+    zone_df["Rsh"] = R_SHALE
+    return well_df, zone_df
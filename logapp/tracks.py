@@ -0,0 +1,97 @@
+# ============================================================
+# DEPTH-TRACK LAYOUT & INTERACTIVE (PLOTLY) VIEWER
+# ============================================================
+# TRACKS is the single definition of the log-plot tracks, shared by the
+# static matplotlib plot and the WebGL viewer. The viewer only ships the
+# samples of the requested depth window (decimated to pixel resolution
+# by MinMaxPyramid) plus a coarse overview of the rest of the well.
+# Plotting libraries are imported on first use so headless callers of
+# this module don't pay for them.
+
+import io
+
+import numpy as np
+
+# curve, axis label, colour, x-range, x-axis type
+TRACKS = [
+    ("GR", "GR (API)", "green", (0, 150), "linear"),
+    ("RHOB", "RHOB (g/cc)", "red", (1.95, 2.95), "linear"),
+    ("NPHI", "NPHI (v/v)", "blue", (0.45, -0.15), "linear"),
+    ("RT", "RT (ohm.m)", "black", (0.2, 2000), "log"),
+    ("Vsh", "Vsh", "green", (0, 1), "linear"),
+    ("PHIE", "PHIE", "blue", (0, 1), "linear"),
+    ("Sw", "Sw", "purple", (0, 1), "linear"),
+]
+
+OVERVIEW_PIXELS = 400
+
+
+def overview_outside(pyramid, top, base, n_pixels=OVERVIEW_PIXELS):
+    # Coarse envelope of the whole well with the viewport cut out
+    values, depth = pyramid.window(pyramid.depth[0], pyramid.depth[-1], n_pixels)
+    above = depth < top
+    below = depth > base
+    return (np.concatenate([values[above], [np.nan], values[below]]),
+            np.concatenate([depth[above], [np.nan], depth[below]]))
+
+
+def plotly_log_figure(pyramids, top, base, n_pixels, height=1200, uirevision=None):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=len(TRACKS), shared_yaxes=True, horizontal_spacing=0.01)
+    for col, (curve, label, color, x_range, x_type) in enumerate(TRACKS, start=1):
+        pyramid = pyramids[curve]
+        values, depth = overview_outside(pyramid, top, base)
+        fig.add_trace(go.Scattergl(x=values, y=depth, mode="lines", name=f"{curve} overview",
+                                   line=dict(color=color, width=1), opacity=0.35,
+                                   showlegend=False, hoverinfo="skip"), row=1, col=col)
+        values, depth = pyramid.window(top, base, n_pixels)
+        fig.add_trace(go.Scattergl(x=values, y=depth, mode="lines", name=curve,
+                                   line=dict(color=color, width=1), showlegend=False), row=1, col=col)
+
+        if x_type == "log":
+            fig.update_xaxes(type="log", range=[np.log10(x_range[0]), np.log10(x_range[1])], row=1, col=col)
+        else:
+            fig.update_xaxes(range=list(x_range), row=1, col=col)
+        fig.update_xaxes(title_text=label, side="top", showgrid=True, griddash="dash", row=1, col=col)
+
+    fig.update_yaxes(range=[base, top], showgrid=True, griddash="dash")
+    fig.update_yaxes(title_text="Depth", row=1, col=1)
+    fig.update_layout(height=height, margin=dict(l=60, r=20, t=60, b=20), uirevision=uirevision)
+    return fig
+
+
+def static_log_png(pyramids, top, base, figsize=(18, 20)):
+    # Figure without pyplot: no global state shared between sessions
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import MultipleLocator
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots(1, len(TRACKS), sharey=True)
+    n_pixels = int(fig.get_figheight() * fig.dpi)
+
+    # 👉 Depth ticks every 10 m, coarser on long windows
+    tick_step = 10
+    while (base - top) / tick_step > 100:
+        tick_step *= 10
+    depth_locator = MultipleLocator(tick_step)
+
+    # ---- GR | RHOB | NPHI | RT | Vsh | PHIE | Sw ----
+    for a, (curve, label, color, x_range, x_type) in zip(ax, TRACKS):
+        a.plot(*pyramids[curve].window(top, base, n_pixels), color=color)
+        a.set_xlabel(label)
+        if x_type == "log":
+            a.set_xscale("log")
+        a.set_xlim(*x_range)
+
+    # ---- Common formatting ----
+    ax[0].set_ylim(base, top)
+    for a in ax:
+        a.grid(True, linestyle="--", alpha=0.5)
+        a.yaxis.set_major_locator(depth_locator)
+
+    fig.tight_layout()
+    png = io.BytesIO()
+    fig.savefig(png, format="png")
+    return png.getvalue()
@@ -0,0 +1,262 @@
+# ============================================================
+# VOLUMETRICS – DETERMINISTIC & MONTE CARLO (P90 / P50 / P10)
+# ============================================================
+# Each input (area, net pay, PHIE, Sw, Bo/Bg, recovery factor) gets a
+# distribution. Trials are drawn in fixed-size chunks through a Gaussian
+# copula (so inputs can be correlated) and folded into log-spaced
+# histograms. Memory therefore stays bounded whatever the trial count,
+# and the percentiles are read back from the histogram to within one bin.
+#
+# Reserves convention: P90 is the low case (90 % chance of exceeding),
+# i.e. the 10th percentile of the distribution.
+
+import numpy as np
+import pandas as pd
+
+OIL_FACTOR = 7758      # bbl / acre-ft
+GAS_FACTOR = 43560     # ft3 / acre-ft
+
+INPUTS = ["Area", "Net Pay", "PHIE", "Sw", "FVF", "RF"]
+FRACTIONS = {"PHIE", "Sw", "RF"}
+DISTRIBUTIONS = ["Fixed", "Triangular", "Normal", "Lognormal", "Uniform"]
+
+CHUNK = 1 << 20
+N_BINS = 4096
+
+
+def in_place(area, net_pay, phie, sw, fvf, factor=OIL_FACTOR):
+    return factor * area * net_pay * phie * (1 - sw) / fvf
+
+
+# ============================================================
+# DISTRIBUTIONS (inverse CDF from standard normal scores)
+# ============================================================
+def _norm_cdf(z):
+    # Abramowitz & Stegun 7.1.26, |error| < 1.5e-7 – plenty for sampling
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _norm_ppf(p):
+    # Acklam's rational approximation, used for the tornado quantiles
+    a = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+    b = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+         6.680131188771972e+01, -1.328068155288572e+01]
+    c = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+    d = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+    if p < 0.02425 or p > 1 - 0.02425:
+        q = np.sqrt(-2 * np.log(min(p, 1 - p)))
+        z = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+        return z if p < 0.5 else -z
+    q = p - 0.5
+    r = q * q
+    return (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+        (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+
+
+def check_input(name, spec):
+    kind = spec["Distribution"]
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"{name}: unknown distribution {kind}")
+    if kind == "Triangular" and not spec["Min"] <= spec["Mode"] <= spec["Max"]:
+        raise ValueError(f"{name}: triangular needs Min ≤ Mode ≤ Max")
+    if kind == "Uniform" and not spec["Min"] <= spec["Max"]:
+        raise ValueError(f"{name}: uniform needs Min ≤ Max")
+    if kind in ("Normal", "Lognormal") and spec["SD"] < 0:
+        raise ValueError(f"{name}: SD must not be negative")
+    if kind == "Lognormal" and spec["Mean"] <= 0:
+        raise ValueError(f"{name}: lognormal needs a positive Mean")
+    if name == "FVF":
+        # Volumes are divided by it: the lowest value drawn (the P90 for a normal) must be positive
+        lowest = {"Fixed": spec["Mode"], "Normal": spec["Mean"] + _norm_ppf(0.1) * spec["SD"],
+                  "Lognormal": spec["Mean"]}.get(kind, spec["Min"])
+        if not lowest > 0:
+            raise ValueError(f"{name}: must stay above 0")
+
+
+def sample(name, spec, z):
+    kind = spec["Distribution"]
+    if kind == "Fixed":
+        x = np.full(z.shape, float(spec["Mode"]))
+    elif kind == "Normal":
+        x = spec["Mean"] + spec["SD"] * z
+    elif kind == "Lognormal":
+        s2 = np.log1p((spec["SD"] / spec["Mean"]) ** 2)
+        x = np.exp(np.log(spec["Mean"]) - 0.5 * s2 + np.sqrt(s2) * z)
+    else:
+        u = _norm_cdf(np.asarray(z, dtype=float))
+        lo, hi = spec["Min"], spec["Max"]
+        if kind == "Uniform":
+            x = lo + (hi - lo) * u
+        else:
+            mode = spec["Mode"]
+            span = hi - lo
+            f_mode = (mode - lo) / span if span > 0 else 0.5
+            x = np.where(u < f_mode,
+                         lo + np.sqrt(u * span * (mode - lo)),
+                         hi - np.sqrt((1 - u) * span * (hi - mode)))
+    # Physical bounds: fractions in [0, 1], everything else non-negative
+    return np.clip(x, 0, 1 if name in FRACTIONS else None)
+
+
+# ============================================================
+# STREAMING PERCENTILES
+# ============================================================
+class LogHistogram:
+    def __init__(self, n_bins=N_BINS):
+        self.n_bins = n_bins
+        self.edges = None
+        self.counts = None
+        self.under = self.over = 0
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.total = 0.0
+
+    def add(self, x):
+        if self.edges is None:
+            positive = x[x > 0]
+            lo = np.log10(positive.min()) - 1 if len(positive) else 0.0
+            hi = np.log10(positive.max()) + 1 if len(positive) else 1.0
+            self.edges = np.linspace(lo, hi, self.n_bins + 1)
+            self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        with np.errstate(divide="ignore"):
+            lx = np.log10(x)
+        self.under += int(np.count_nonzero(lx < self.edges[0]))
+        self.over += int(np.count_nonzero(lx > self.edges[-1]))
+        self.counts += np.histogram(lx, bins=self.edges)[0]
+        self.n += len(x)
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.total += float(x.sum())
+
+    def quantile(self, q):
+        target = q * self.n
+        if target <= self.under:
+            return self.min
+        cum = self.under + np.cumsum(self.counts)
+        i = int(np.searchsorted(cum, target))
+        if i >= self.n_bins:
+            return self.max
+        before = cum[i - 1] if i else self.under
+        frac = (target - before) / max(self.counts[i], 1)
+        value = 10 ** (self.edges[i] + frac * (self.edges[i + 1] - self.edges[i]))
+        return float(np.clip(value, self.min, self.max))
+
+    def cdf(self):
+        # (values, cumulative probability) at the bin edges
+        cum = (self.under + np.concatenate([[0], np.cumsum(self.counts)])) / max(self.n, 1)
+        keep = np.concatenate([[True], self.counts > 0])
+        return 10 ** self.edges[keep], cum[keep]
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+
+# ============================================================
+# MONTE CARLO
+# ============================================================
+def correlated_normals(rng, n, chol=None):
+    # One contiguous row per input; float32 halves the cost and is ample here
+    z = rng.standard_normal((len(INPUTS), n), dtype=np.float32)
+    return (chol.astype(np.float32) @ z) if chol is not None else z
+
+
+def simulate(specs, n_trials=1_000_000, factor=OIL_FACTOR, correlation=None, seed=None, chunk=CHUNK):
+    # specs: {input name: {"Distribution", "Min", "Mode", "Max", "Mean", "SD"}}
+    for name in INPUTS:
+        check_input(name, specs[name])
+    chol = None
+    if correlation is not None:
+        correlation = np.asarray(correlation, dtype=float)
+        # Cholesky only reads the lower triangle, so symmetry is checked first
+        if correlation.shape != (len(INPUTS), len(INPUTS)) or not np.allclose(correlation, correlation.T):
+            raise ValueError("Correlation matrix must be symmetric positive definite")
+        if not np.allclose(correlation, np.eye(len(INPUTS))):
+            try:
+                chol = np.linalg.cholesky(correlation)
+            except np.linalg.LinAlgError:
+                raise ValueError("Correlation matrix must be symmetric positive definite")
+
+    rng = np.random.default_rng(seed)
+    hist_ip, hist_rec = LogHistogram(), LogHistogram()
+    for start in range(0, n_trials, chunk):
+        n = min(chunk, n_trials - start)
+        z = correlated_normals(rng, n, chol)
+        x = {name: sample(name, specs[name], z[i]) for i, name in enumerate(INPUTS)}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ip = in_place(x["Area"], x["Net Pay"], x["PHIE"], x["Sw"], x["FVF"], factor)
+        ip = np.nan_to_num(ip, nan=0.0, posinf=0.0)
+        hist_ip.add(ip)
+        hist_rec.add(ip * x["RF"])
+
+    percentiles = pd.DataFrame({
+        "In Place": [hist_ip.quantile(q) for q in (0.1, 0.5, 0.9)] + [hist_ip.mean],
+        "Recoverable": [hist_rec.quantile(q) for q in (0.1, 0.5, 0.9)] + [hist_rec.mean],
+    }, index=["P90", "P50", "P10", "Mean"])
+    return {
+        "percentiles": percentiles,
+        "cdf_in_place": hist_ip.cdf(),
+        "cdf_recoverable": hist_rec.cdf(),
+        "tornado": tornado(specs, factor),
+    }
+
+
+def tornado(specs, factor=OIL_FACTOR):
+    # Recoverable volume with one input at its own P90 / P10 and the rest at P50
+    z_low, z_high = _norm_ppf(0.1), _norm_ppf(0.9)
+    base = {name: float(sample(name, specs[name], np.zeros(1))[0]) for name in INPUTS}
+
+    def recoverable(values):
+        return in_place(values["Area"], values["Net Pay"], values["PHIE"], values["Sw"], values["FVF"], factor) * values["RF"]
+
+    rows = []
+    for name in INPUTS:
+        low = float(sample(name, specs[name], np.array([z_low]))[0])
+        high = float(sample(name, specs[name], np.array([z_high]))[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out_low = recoverable({**base, name: low})
+            out_high = recoverable({**base, name: high})
+        rows.append({"Input": name, "Low Input": low, "High Input": high,
+                     "Low Result": out_low, "High Result": out_high, "Swing": abs(out_high - out_low)})
+    result = pd.DataFrame(rows).sort_values("Swing", ascending=False, kind="stable").reset_index(drop=True)
+    result.attrs["base"] = recoverable(base)
+    return result
+
+
+# ============================================================
+# PER-ZONE VOLUMETRICS FROM THE LOG EVALUATION SUMMARY
+# ============================================================
+FT_PER_M = 3.28084
+ZONE_VOLUME_DEFAULTS = {"Area (acres)": 100.0, "FVF": 1.5, "RF": 0.1}
+
+
+def zone_volume_table(summary_df, area=100.0, fvf=1.5, rf=0.1):
+    # Editable per-zone input table built from one or more zone summaries
+    cols = ["Well", "Zone Name", "Net Thickness", "Net PHIE (h-wtd)", "Net Sw (PV-wtd)", "HCPT"]
+    table = summary_df[[col for col in cols if col in summary_df.columns]].copy()
+    if "Well" not in table.columns:
+        table.insert(0, "Well", "")
+    table["Area (acres)"] = area
+    table["FVF"] = fvf
+    table["RF"] = rf
+    return table.reset_index(drop=True)
+
+
+def zone_volumes(table, factor=OIL_FACTOR, depth_unit="ft"):
+    # HCPT = Σ PHIE·(1−Sw)·h over net pay, so in place = factor · A · HCPT / FVF
+    to_ft = FT_PER_M if depth_unit == "m" else 1.0
+    hcpt = table["HCPT"].to_numpy(dtype=float) * to_ft
+    area = table["Area (acres)"].to_numpy(dtype=float)
+    fvf = table["FVF"].to_numpy(dtype=float)
+    rf = table["RF"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume = factor * area * hcpt / fvf
+    return table.assign(**{"In Place": volume, "Recoverable": volume * rf})
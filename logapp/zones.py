@@ -0,0 +1,121 @@
+# ============================================================
+# ZONE INTERVAL INDEX
+# ============================================================
+# Zones are turned into a sorted set of depth breakpoints once, so every
+# depth sample can be mapped to its zone with one searchsorted pass
+# instead of one boolean mask per zone.
+#
+# Zone ids are row positions in the zone table, -1 means "no zone".
+# Intervals are inclusive ([Top, Base]) like the original masks. Where
+# zones overlap, the zone with the deeper top wins the shared interval.
+# Ids are stored in the narrowest integer type that fits the zone count;
+# the zone names act as the category table for them.
+
+import numpy as np
+import pandas as pd
+
+NO_ZONE = -1
+
+
+class ZoneIndex:
+    def __init__(self, tops, bases, names=None):
+        self.tops = np.asarray(tops, dtype=float)
+        self.bases = np.asarray(bases, dtype=float)
+        self.n_zones = len(self.tops)
+        self.names = list(names) if names is not None else [f"Zone_{i+1}" for i in range(self.n_zones)]
+        self.id_dtype = np.int16 if self.n_zones < np.iinfo(np.int16).max else np.int32
+
+        valid = np.isfinite(self.tops) & np.isfinite(self.bases) & (self.tops <= self.bases)
+        self.invalid = np.flatnonzero(~valid).tolist()
+
+        rows = np.flatnonzero(valid)
+        # Shallow to deep, later rows first on equal tops so table order decides ties
+        self._sorted = rows[np.lexsort((rows, self.tops[rows]))]
+
+        self.breaks = np.unique(np.concatenate([self.tops[rows], self.bases[rows]]))
+        n_breaks = len(self.breaks)
+        self._point_owner = np.full(n_breaks, NO_ZONE, dtype=np.int32)
+        self._segment_owner = np.full(n_breaks, NO_ZONE, dtype=np.int32)
+
+        # Paint zones shallow-to-deep so the deepest-starting zone owns overlaps
+        for i in self._sorted:
+            lo = np.searchsorted(self.breaks, self.tops[i])
+            hi = np.searchsorted(self.breaks, self.bases[i])
+            self._point_owner[lo:hi + 1] = i
+            self._segment_owner[lo:hi] = i
+
+    @classmethod
+    def from_frame(cls, zone_df, name_col="Zone Name", top_col="Top Depth", base_col="Base Depth"):
+        return cls(zone_df[top_col].to_numpy(dtype=float),
+                   zone_df[base_col].to_numpy(dtype=float),
+                   zone_df[name_col].astype(str).tolist())
+
+    # ---- QUALITY CHECKS ----
+    def overlaps(self):
+        pairs = []
+        order = self._sorted
+        for k, i in enumerate(order):
+            for j in order[k + 1:]:
+                if self.tops[j] >= self.bases[i]:
+                    break
+                pairs.append((int(i), int(j)))
+        return pairs
+
+    def gaps(self):
+        gaps = []
+        if len(self._sorted) == 0:
+            return gaps
+        reach = self.bases[self._sorted[0]]
+        for i in self._sorted[1:]:
+            if self.tops[i] > reach:
+                gaps.append((float(reach), float(self.tops[i])))
+            reach = max(reach, self.bases[i])
+        return gaps
+
+    # ---- SAMPLE ASSIGNMENT ----
+    def assign(self, depth):
+        depth = np.asarray(depth, dtype=float)
+        if len(self.breaks) == 0:
+            return np.full(depth.shape, NO_ZONE, dtype=self.id_dtype)
+        pos = np.searchsorted(self.breaks, depth, side="right") - 1
+        inside = pos >= 0
+        pos_c = np.clip(pos, 0, None)
+        on_break = inside & (self.breaks[pos_c] == depth)
+        ids = np.where(on_break, self._point_owner[pos_c], self._segment_owner[pos_c])
+        ids[~inside] = NO_ZONE
+        return ids.astype(self.id_dtype)
+
+    def labels(self, zone_ids):
+        # Zone names as a categorical over the id array, NO_ZONE -> NaN
+        categories, codes = np.unique(np.array(self.names, dtype=object), return_inverse=True)
+        codes = np.append(codes.reshape(-1), NO_ZONE)
+        return pd.Categorical.from_codes(codes[zone_ids], categories)
+
+
+# ============================================================
+# ZONE TABLE FILES
+# ============================================================
+ZONE_COLUMNS = ["Zone Name", "Top Depth", "Base Depth"]
+ZONE_DEFAULTS = {
+    "GR_clean": 20.0,
+    "GR_shale": 120.0,
+    "Matrix Density": 2.65,
+    "Shale Density": 2.40,
+    "Fluid Density": 1.00,
+    "a": 1.0,
+    "m": 2.0,
+    "n": 2.0,
+    "Rw": 0.03,
+    "Rsh": 2.0,
+}
+
+
+def read_zone_table(source):
+    zone_df = pd.read_csv(source)
+    missing = [col for col in ZONE_COLUMNS if col not in zone_df.columns]
+    if missing:
+        raise ValueError("Zone table must contain " + ", ".join(ZONE_COLUMNS) + " (missing: " + ", ".join(missing) + ")")
+    for col, default in ZONE_DEFAULTS.items():
+        if col not in zone_df.columns:
+            zone_df[col] = default
+    return zone_df[ZONE_COLUMNS + list(ZONE_DEFAULTS)]
@@ -3,11 +3,141 @@
 # Senior Petrophysicist & Python Software Engineer
 # ============================================================
 
+import json
+import os
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator , AutoMinorLocator
+import plotly.graph_objects as go
+
+from logapp.ingest import REQUIRED_COLS, MissingCurvesError, content_hash, ingest_csv, load_cached, store_curves
+from logapp.curves import DEPTH_COL, CurveSet
+from logapp.preview import PAGE_SIZES, column_stats, depth_page, page_count, page_window
+from logapp.merge import MERGE_RULES, merge_key, merged_dataset, sample_step
+from logapp.zones import ZoneIndex
+from logapp.kernel import VSH_METHODS, POROSITY_METHODS, SW_METHODS, ZONE_PARAMS, sw_solver_mask
+from logapp.pipeline import NODES, EvaluationGraph
+from logapp.jobs import CANCELLED, DONE, FAILED, QueueFull, job_queue
+from logapp.decimate import MinMaxPyramid
+from logapp.tracks import plotly_log_figure, static_log_png
+from logapp.cache import LRUCache, array_hash, server_cache
+from logapp.summary import SUMMARY_FORMAT, sample_intervals, zone_summary
+from logapp.project import project_store
+from logapp.sensitivity import cutoff_grid, max_steps, net_cube, zone_knees
+from logapp.autopick import apply_picks, zone_picks
+from logapp.profiling import SessionProfile, StageProfiler
+from logapp.export import (
+    EXPORT_DIR, EXPORT_FORMATS, LAS_DEPTH_UNITS, available_formats, export_results, export_table, prune_exports,
+)
+
+
+# Rendered plots are shared by all sessions, bounded in size
+@st.cache_resource
+def plot_cache():
+    return LRUCache(max_bytes=int(os.environ.get("LOGAPP_PLOT_CACHE_MB", 256)) * 2**20)
+
+
+# ============================================================
+# BACKGROUND JOBS (shared worker pool, picked up on the next rerun)
+# ============================================================
+# Short jobs finish within this wait and show up in the same run
+FOREGROUND_WAIT = 0.5
+
+
+@st.fragment(run_every=0.5)
+def job_panel(key, label):
+    job = job_queue().get(key)
+    if job is None or not job.active:
+        # Finished: a full rerun picks up the result
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {label}: {job.message or job.state} ({job.elapsed():.1f} s)")
+    if st.button("✖️ Cancel", key=f"cancel_{label}"):
+        # Only stops the job if no other session is waiting for it
+        job_queue().release(key, job_waiter())
+        st.session_state.setdefault("released_jobs", set()).add(key)
+        st.rerun()
+
+
+def job_waiter():
+    # This session's token on the shared jobs it is waiting for
+    return st.session_state.setdefault("job_waiter", uuid.uuid4().hex)
+
+
+def background(key, label, build, *args):
+    # The finished job when ready, else None (with progress / retry controls shown)
+    queue = job_queue()
+    released = st.session_state.setdefault("released_jobs", set())
+    if key in released:
+        # Cancelled in this session (it may still run for others)
+        st.info(f"✖️ {label} cancelled")
+        if st.button("▶️ Run again", key=f"rerun_{label}"):
+            released.discard(key)
+            st.rerun()
+        return None
+    job = queue.get(key, waiter=job_waiter())
+    if job is None:
+        try:
+            job = queue.submit(key, build, *args, label=label, waiter=job_waiter())
+        except QueueFull as exc:
+            st.warning(f"⏳ Server busy ({exc}) – change any input or rerun to retry")
+            return None
+    job.wait(FOREGROUND_WAIT)
+    if job.state == DONE:
+        return job
+    if job.state in (FAILED, CANCELLED):
+        if job.state == FAILED:
+            st.error(f"❌ {label} failed: {job.error}")
+        else:
+            st.info(f"✖️ {label} cancelled")
+        if st.button("▶️ Run again", key=f"rerun_{label}"):
+            queue.forget(key)
+            st.rerun()
+        return None
+    job_panel(key, label)
+    return None
+
+
+def evaluation_job(job, graph, eval_key, zone_ids, zone_df, settings):
+    def progress(node, done, total):
+        job.report((NODES.index(node) + done / max(total, 1)) / len(NODES),
+                   f"{node} {done:,} / {total:,} samples")
+
+    with graph.lock:
+        graph.update(zone_ids, zone_df, *settings, progress=progress)
+        snapshot = graph.snapshot(eval_key)
+    server_cache().put(eval_key, snapshot)
+    return snapshot
+
+
+def export_job(job, path, curves, results, zone_ids, zone_df, fmt, well, field, depth_unit):
+    def progress(done, total):
+        job.report(done / max(total, 1), f"{fmt} {done:,} / {total:,} samples")
+
+    # Written under a temporary name so a half-written file is never offered for download
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    partial = f"{path}.partial"
+    try:
+        export_results(partial, curves, results, zone_ids, zone_df, fmt, well=well, field=field,
+                       depth_unit=depth_unit, progress=progress)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    prune_exports()
+    return path
+
+
+def project_save_job(job, name, field, dataset_key, curves, snapshot, zone_df, parameters, replace):
+    # Curves are written once per dataset, then the inputs, the results and their zone summary
+    job.report(0.0, "curves")
+    project_store().save_well(name, field, dataset_key, curves, replace=replace)
+    project_store().save_zones(name, zone_df)
+    project_store().save_parameters(name, parameters)
+    job.report(0.5, "results")
+    summary_df = zone_summary(curves[DEPTH_COL], snapshot["zone_ids"], snapshot["results"], zone_df)
+    return project_store().save_evaluation(name, snapshot, summary_df)
 
 
 # ============================================================
@@ -25,12 +155,43 @@ if st.session_state.get("authenticated"):
     # SIDEBAR – WELL INFORMATION
     # ============================================================
     st.sidebar.header("🧾 Well Information")
-    well_name = st.sidebar.text_input("Well Name", "Well-01")
-    field_name = st.sidebar.text_input("Field Name", "Field-A")
+
+    # ---- PROJECT STORE (curves, zone tables, parameters and results survive a refresh) ----
+    project = project_store()
+    stored_wells = project.wells()
+    stored_wells = stored_wells[stored_wells["Samples"].notna()]
+
+    def open_well():
+        name = st.session_state["project_well"]
+        if name is not None:
+            st.session_state["well_name"] = name
+            st.session_state["field_name"] = stored_wells.set_index("Well").at[name, "Field"] or ""
+
+    opened_well = st.sidebar.selectbox("📂 Open well from project", [None] + stored_wells["Well"].tolist(),
+                                       key="project_well", on_change=open_well,
+                                       format_func=lambda name: "— upload below —" if name is None else name)
+    st.session_state.setdefault("well_name", "Well-01")
+    st.session_state.setdefault("field_name", "Field-A")
+    well_name = st.sidebar.text_input("Well Name", key="well_name")
+    field_name = st.sidebar.text_input("Field Name", key="field_name")
+    with st.sidebar.expander("🗄️ Project wells"):
+        st.dataframe(stored_wells[["Well", "Field", "Samples", "Top", "Base", "Last Evaluated"]], hide_index=True)
+        st.caption(f"Stored in {project.path}")
+
+    # Zone table and parameters last used on this well, read once per well name
+    if st.session_state.get("project_state", (None,))[0] != well_name:
+        st.session_state["project_state"] = (well_name, project.load_zones(well_name),
+                                             project.load_parameters(well_name) or {})
+    _, stored_zones, stored_params = st.session_state["project_state"]
 
     st.sidebar.markdown("---")
     # n_zones = st.sidebar.number_input("Number of Zones", 1, 10, 3)
 
+    # ---- OPT-IN PROFILING (wall / CPU / peak memory per stage) ----
+    profiling = st.sidebar.toggle("⏱️ Profile this session", value=os.environ.get("LOGAPP_PROFILE") == "1")
+    prof = StageProfiler(enabled=profiling, page="Well Logging Evaluation")
+    prof.watch(well_name=well_name, field_name=field_name)
+
     # ============================================================
     # TABS
     # ============================================================
@@ -50,26 +211,160 @@ if st.session_state.get("authenticated"):
         st.write("**Required Columns to start well analysis** : ")
         st.write(':blue[**Depth, GR, RHOB, NPHI, RT, PE**]')
         st.write("____________________________")  
-        uploaded_file = st.file_uploader("Upload CSV File", type=["csv"])
-
-        if uploaded_file:
-            df = pd.read_csv(uploaded_file)
-            n_rows = st.slider('**Choose the number of rows to display** : ', min_value=5 , max_value=len(df),step=1)
-            Columns_to_show=st.multiselect("**Select coloumns to show** : ", df.columns.to_list() , default=df.columns.to_list())
-            numerical_columns = df.select_dtypes(include=np.number).columns.to_list()
-            st.write(df[:n_rows][Columns_to_show])
-            required_cols = ["Depth", "GR", "RHOB", "NPHI", "RT", "PE"]
-
-            if not all(col in df.columns for col in required_cols):
-                st.error("❌ CSV must contain all required curves")
+        uploaded_files = st.file_uploader("Upload CSV File (several files are merged as logging runs)",
+                                          type=["csv"], accept_multiple_files=True)
+        prof.watch(uploaded_files=tuple(getattr(f, "file_id", f.name) for f in uploaded_files))
+
+        # ---- INGEST (parsed once per file content, shared by all sessions) ----
+        def load_runs(uploaded_files):
+            # Returns [(label, dataset_key, curves)]; required curves are checked on the merged well
+            held = st.session_state.get("well_runs", {})
+            kept, runs = {}, []
+            for i, uploaded_file in enumerate(uploaded_files):
+                file_id = getattr(uploaded_file, "file_id", (uploaded_file.name, uploaded_file.size))
+                if file_id not in held:
+                    data = uploaded_file.getvalue()
+                    key = content_hash(data)
+                    # The lease pins the dataset in the server cache while this session holds it
+                    curves, lease = server_cache().acquire(("dataset", key),
+                                                           lambda: ingest_csv(data, required_cols=[DEPTH_COL], key=key)[1])
+                    held[file_id] = (key, curves, lease)
+                kept[file_id] = held[file_id]
+                runs.append((f"{i + 1}: {uploaded_file.name}", *held[file_id][:2]))
+            for file_id in held.keys() - kept.keys():
+                held[file_id][2].release()
+            st.session_state["well_runs"] = kept
+            return runs
+
+        def load_merged(runs, step, rule, shifts):
+            run_keys = [key for _, key, _ in runs]
+            dataset_key = merge_key(run_keys, step, rule, shifts)
+            cached = st.session_state.get("well_merge")
+            if cached and cached[0] == dataset_key:
+                return dataset_key, cached[1]
+            curves, lease = server_cache().acquire(("dataset", dataset_key), lambda: merged_dataset(
+                [curves for _, _, curves in runs], run_keys, step, rule, shifts)[1])
+            if cached:
+                cached[2].release()
+            st.session_state["well_merge"] = (dataset_key, curves, lease)
+            return dataset_key, curves
+
+        def merge_controls(runs):
+            # Overlap priority, grid step and per-curve depth shifts
+            labels = [label for label, _, _ in runs]
+            st.dataframe(pd.DataFrame({
+                "Run": labels,
+                "Samples": [len(curves[DEPTH_COL]) for _, _, curves in runs],
+                "Step": [sample_step(curves[DEPTH_COL]) for _, _, curves in runs],
+                "Top": [curves[DEPTH_COL][0] for _, _, curves in runs],
+                "Base": [curves[DEPTH_COL][-1] for _, _, curves in runs],
+                "Curves": [", ".join(c for c in curves if c != DEPTH_COL) for _, _, curves in runs],
+            }), hide_index=True)
+            rule = st.radio("**Overlap priority**", MERGE_RULES, horizontal=True,
+                            format_func={"first": "First listed run wins", "last": "Last listed run wins",
+                                         "finest": "Finest sampling wins"}.get)
+            finest = min(sample_step(curves[DEPTH_COL]) for _, _, curves in runs)
+            step = st.number_input("**Grid step**", min_value=0.001, value=round(finest, 4), format="%.4f")
+            st.caption("Depth shifts (+ = deeper). Shifting Depth moves the whole run.")
+            all_curves = sorted({c for _, _, curves in runs for c in curves} - {DEPTH_COL})
+            shift_table = st.data_editor(
+                pd.DataFrame({"Run": pd.Series(dtype=str), "Curve": pd.Series(dtype=str),
+                              "Shift": pd.Series(dtype=float)}),
+                num_rows="dynamic", key="depth_shifts",
+                column_config={"Run": st.column_config.SelectboxColumn(options=labels),
+                               "Curve": st.column_config.SelectboxColumn(options=[DEPTH_COL] + all_curves)})
+            shifts = [{} for _ in runs]
+            for run_label, curve, shift in shift_table.dropna().itertuples(index=False):
+                shifts[labels.index(run_label)][curve] = float(shift)
+            prof.watch(merge_rule=rule, grid_step=step, depth_shifts=shift_table)
+            return step, rule, shifts
+
+        def load_project_well(name):
+            # Stored curves go back into the memory-mapped .npy cache and are leased like an upload
+            dataset_key = project.dataset_key(name)
+            held = st.session_state.get("project_dataset")
+            if held and held[0] == dataset_key:
+                return dataset_key, held[1]
+
+            def build():
+                if load_cached(dataset_key) is None:
+                    store_curves(dataset_key, project.load_curves(name)[1])
+                return load_cached(dataset_key)
+
+            curves, lease = server_cache().acquire(("dataset", dataset_key), build)
+            if held:
+                held[2].release()
+            st.session_state["project_dataset"] = (dataset_key, curves, lease)
+            return dataset_key, curves
+
+        data_ready = False
+        if uploaded_files or opened_well:
+            try:
+                if not uploaded_files:
+                    with prof.stage("ingest"):
+                        dataset_key, curves = load_project_well(opened_well)
+                    st.caption(f"📂 {opened_well} opened from the project")
+                else:
+                    if "project_dataset" in st.session_state:
+                        st.session_state.pop("project_dataset")[2].release()
+                    with prof.stage("ingest"):
+                        runs = load_runs(uploaded_files)
+                    if len(runs) == 1:
+                        _, dataset_key, curves = runs[0]
+                        if "well_merge" in st.session_state:
+                            st.session_state.pop("well_merge")[2].release()
+                    else:
+                        with st.expander(f"🔗 Merge {len(runs)} logging runs", expanded=True):
+                            merge_settings = merge_controls(runs)
+                        with prof.stage("merge"):
+                            dataset_key, curves = load_merged(runs, *merge_settings)
+                missing = [col for col in REQUIRED_COLS if col not in curves]
+                if missing:
+                    raise MissingCurvesError(missing)
+            except MissingCurvesError as exc:
+                st.error(f"❌ CSV must contain all required curves ({', '.join(exc.missing)} missing)")
+            except ValueError as exc:
+                st.error(f"❌ Could not merge the logging runs: {exc}")
             else:
-                df = df.dropna().sort_values("Depth").reset_index(drop=True)
+                # Curves stay as (memory-mapped) arrays, frames are built for the shown rows only
+                logs = CurveSet(curves)
+                depth = logs["Depth"]
+                Columns_to_show=st.multiselect("**Select coloumns to show** : ", logs.columns , default=logs.columns)
+                numerical_columns = logs.numeric_columns()
+
+                # ---- PAGINATED PREVIEW (only the visible page leaves the server) ----
+                p1, p2, p3 = st.columns(3)
+                page_size = p1.selectbox("**Rows per page**", PAGE_SIZES, index=1, key="preview_page_size")
+                n_pages = page_count(len(logs), page_size)
+                if st.session_state.get("preview_page", 1) > n_pages:
+                    st.session_state["preview_page"] = n_pages
+
+                def jump_to_depth():
+                    if st.session_state["preview_depth"] is not None:
+                        st.session_state["preview_page"] = depth_page(
+                            depth, st.session_state["preview_depth"], st.session_state["preview_page_size"])
+
+                p3.number_input("**Jump to depth**", min_value=float(depth[0]), max_value=float(depth[-1]),
+                                value=None, key="preview_depth", on_change=jump_to_depth)
+                page = p2.number_input(f"**Page** (of {n_pages:,})", 1, n_pages, key="preview_page")
+                prof.watch(columns_to_show=Columns_to_show, page_size=page_size, page=page)
+                with prof.stage("preview"):
+                    window = page_window(logs, page, page_size, Columns_to_show)
+                    st.dataframe(window, height=400)
+                st.caption(f"Samples {window.index[0]:,}–{window.index[-1]:,} of {len(logs):,}" if len(window) else "No samples")
+
+                with prof.stage("column_stats"):
+                    stats = server_cache().get_or_build(("column_stats", dataset_key), lambda: column_stats(logs))
+                with st.expander("📈 Column statistics", expanded=True):
+                    st.dataframe(stats.style.format({"Min": "{:.4g}", "Max": "{:.4g}", "Mean": "{:.4g}", "Nulls": "{:,}"}))
+                required_cols = REQUIRED_COLS
+                data_ready = True
                 st.success("✅ Well logs loaded successfully")
-                st.dataframe(df.head())
 
         st.markdown("---")
         st.header("📊 Zone-Based Petrophysical Parameters")
-        n_zones = st.number_input("**Insert Number of Zones below** :- ", 1, 200, 3)
+        n_zones = st.number_input("**Insert Number of Zones below** :- ", 1, 200,
+                                  len(stored_zones) if stored_zones is not None else 3)
         st.write("____________________________") 
 
         zone_input = {
@@ -84,37 +379,46 @@ if st.session_state.get("authenticated"):
             "a": [1.0] * n_zones,
             "m": [2.0] * n_zones,
             "n": [2.0] * n_zones,
-            "Rw": [0.03] * n_zones
+            "Rw": [0.03] * n_zones,
+            "Rsh": [2.0] * n_zones
         }
 
-        zone_df = st.data_editor(pd.DataFrame(zone_input), num_rows="dynamic")
-
-    # ============================================================
-    # PETROPHYSICAL FUNCTIONS
-    # ============================================================
-    def vsh_linear(gr, gr_clean, gr_shale):
-        vsh = (gr - gr_clean) / (gr_shale - gr_clean)
-        return np.clip(vsh, 0, 1)
-
-    def vsh_larionov(gr, gr_clean, gr_shale):
-        igr = (gr - gr_clean) / (gr_shale - gr_clean)
-        vsh = 0.083 * (2 ** (3.7 * igr) - 1)
-        return np.clip(vsh, 0, 1)
-
-    def density_porosity(rhob, rho_matrix, rho_fluid):
-        return (rho_matrix - rhob) / (rho_matrix - rho_fluid)
-
-    def neutron_density_porosity(nphi, phi_d):
-        return (nphi + phi_d) / 2
-
-    def sw_archie(rt, rw, phi, a, m, n):
-        return ((a * rw) / (rt * (phi ** m))) ** (1 / n)
-
-    def sw_simandoux(rt, rw, phi, vsh):
-        return np.sqrt((rw / rt) / (phi ** 2 + vsh))
-
-    def sw_indonesian(rt, rw, phi, vsh, m, n):
-        return ((rw / rt) ** (1 / n)) / (phi ** m + vsh ** 2)
+        # Auto-picked tables (for these logs), then the table last saved for this well, replace
+        # the defaults until the zone count changes
+        pick_key = (dataset_key if data_ready else None, n_zones)
+        picked_table = st.session_state.get("picked_zone_table")
+        if picked_table and picked_table[0] == pick_key:
+            zone_table = picked_table[1]
+        elif stored_zones is not None and len(stored_zones) == n_zones:
+            zone_table = stored_zones
+        else:
+            zone_table = pd.DataFrame(zone_input)
+
+        zone_df = st.data_editor(zone_table, num_rows="dynamic")
+        prof.watch(n_zones=n_zones, zone_table=zone_df)
+
+        # A project well of this name holding other curves is never written over implicitly
+        project_conflict = data_ready and project.dataset_key(well_name) not in (None, dataset_key)
+        saved_zones = st.session_state.get("saved_zones")
+        if data_ready and not project_conflict and (
+                saved_zones is None or saved_zones[0] != well_name or not saved_zones[1].equals(zone_df)):
+            project.save_zones(well_name, zone_df)
+            st.session_state["saved_zones"] = (well_name, zone_df.copy())
+
+        # ---- AUTO-PICK (GR P5/P95 and RHOMAA mode, all zones in one pass) ----
+        if data_ready:
+            if st.button("🎯 Auto-pick GR_clean / GR_shale / Matrix Density from the logs"):
+                with prof.stage("auto_pick"):
+                    picks = zone_picks(curves, ZoneIndex.from_frame(zone_df).assign(depth), zone_df)
+                st.session_state["picked_zone_table"] = (pick_key, apply_picks(zone_df, picks))
+                st.session_state["zone_picks"] = (pick_key, picks)
+                st.rerun()
+            if st.session_state.get("zone_picks", (None,))[0] == pick_key:
+                with st.expander("Auto-pick details"):
+                    st.caption("GR_clean / GR_shale = P5 / P95 of GR per zone. Matrix Density = mode of "
+                               "(RHOB − NPHI·ρf) / (1 − NPHI) over the cleaner samples. "
+                               "Zones without samples keep their values; edit any cell above to override.")
+                    st.dataframe(st.session_state["zone_picks"][1].style.format(precision=3))
 
     # ============================================================
     # TAB 2 – PETROPHYSICAL CALCULATIONS
@@ -122,61 +426,201 @@ if st.session_state.get("authenticated"):
     with tab2:
         st.header("🧮 Petrophysical Calculations")
 
-        if uploaded_file:
+        if data_ready:
 
             # ---- METHODS ----
-            vsh_method = st.selectbox("Shale Volume Method", ["Linear", "Larionov"])
-            porosity_method = st.selectbox("Porosity Method", ["Density", "Neutron-Density"])
-            sw_method = st.selectbox("Water Saturation Method", ["Archie", "Simandoux", "Indonesian"])
-
-            st.subheader("Net Pay Cutoffs")
-            vsh_cutoff = st.number_input("Vsh Cutoff", value=0.4)
-            phi_cutoff = st.number_input("Porosity Cutoff", value=0.10)
-            sw_cutoff = st.number_input("Water Saturation Cutoff", value=0.6)
+            # Defaults are the parameter set last saved for this well
+            def stored_index(options, name):
+                return options.index(stored_params[name]) if stored_params.get(name) in options else 0
 
-            results = []
+            vsh_method = st.selectbox("Shale Volume Method", VSH_METHODS, index=stored_index(VSH_METHODS, "vsh_method"))
+            porosity_method = st.selectbox("Porosity Method", POROSITY_METHODS,
+                                           index=stored_index(POROSITY_METHODS, "porosity_method"))
+            sw_method = st.selectbox("Water Saturation Method", SW_METHODS, index=stored_index(SW_METHODS, "sw_method"))
 
-            for _, zone in zone_df.iterrows():
-                mask = (df["Depth"] >= zone["Top Depth"]) & (df["Depth"] <= zone["Base Depth"])
-                z = df[mask].copy()
-
-                # ---- VSH ----
-                if vsh_method == "Linear":
-                    z["Vsh"] = vsh_linear(z["GR"], zone["GR_clean"], zone["GR_shale"])
-                else:
-                    z["Vsh"] = vsh_larionov(z["GR"], zone["GR_clean"], zone["GR_shale"])
-
-                # ---- POROSITY ----
-                phi_d = density_porosity(z["RHOB"], zone["Matrix Density"], zone["Fluid Density"])
-                if porosity_method == "Neutron-Density":
-                    z["PHIT"] = neutron_density_porosity(z["NPHI"], phi_d)
-                else:
-                    z["PHIT"] = phi_d
-
-                z["PHIE"] = z["PHIT"] * (1 - z["Vsh"])
-
-                # ---- WATER SATURATION ----
-                if sw_method == "Archie":
-                    z["Sw"] = sw_archie(z["RT"], zone["Rw"], z["PHIE"], zone["a"], zone["m"], zone["n"])
-                elif sw_method == "Simandoux":
-                    z["Sw"] = sw_simandoux(z["RT"], zone["Rw"], z["PHIE"], z["Vsh"])
-                else:
-                    z["Sw"] = sw_indonesian(z["RT"], zone["Rw"], z["PHIE"], z["Vsh"], zone["m"], zone["n"])
-
-                z["Sw"] = np.clip(z["Sw"], 0, 1)
-
-                # ---- NET PAY ----
-                z["Net"] = ((z["Vsh"] <= vsh_cutoff) & (z["PHIE"] >= phi_cutoff) & (z["Sw"] <= sw_cutoff))
-                z["Zone"] = zone["Zone Name"]
-                results.append(z)
-
-            result_df = pd.concat(results)
-            if results:
-                result_df = pd.concat(results)
+            st.subheader("Net Pay Cutoffs")
+            vsh_cutoff = st.number_input("Vsh Cutoff", value=stored_params.get("vsh_cutoff", 0.4))
+            phi_cutoff = st.number_input("Porosity Cutoff", value=stored_params.get("phi_cutoff", 0.10))
+            sw_cutoff = st.number_input("Water Saturation Cutoff", value=stored_params.get("sw_cutoff", 0.6))
+            prof.watch(vsh_method=vsh_method, porosity_method=porosity_method, sw_method=sw_method,
+                       vsh_cutoff=vsh_cutoff, phi_cutoff=phi_cutoff, sw_cutoff=sw_cutoff)
+            parameters = {"vsh_method": vsh_method, "porosity_method": porosity_method, "sw_method": sw_method,
+                          "vsh_cutoff": vsh_cutoff, "phi_cutoff": phi_cutoff, "sw_cutoff": sw_cutoff}
+            if not project_conflict and st.session_state.get("saved_parameters") != (well_name, parameters):
+                project.save_parameters(well_name, parameters)
+                st.session_state["saved_parameters"] = (well_name, parameters)
+
+            # ---- ZONE ASSIGNMENT (one searchsorted pass over all zones) ----
+            with prof.stage("zone_assign"):
+                zone_index = ZoneIndex.from_frame(zone_df)
+                zone_ids = zone_index.assign(depth)
+
+            for i in zone_index.invalid:
+                st.warning(f"⚠️ {zone_index.names[i]}: Top/Base depth missing or Top below Base – zone skipped")
+            for i, j in zone_index.overlaps():
+                st.warning(f"⚠️ {zone_index.names[i]} overlaps {zone_index.names[j]} – shared interval assigned to {zone_index.names[j]}")
+            for top_gap, base_gap in zone_index.gaps():
+                st.info(f"ℹ️ No zone defined between {top_gap:g} and {base_gap:g}")
+
+            # ---- INCREMENTAL EVALUATION (only changed nodes / zones recompute) ----
+            cached_graph = st.session_state.get("eval_graph")
+            if cached_graph and cached_graph[0] == dataset_key:
+                graph = cached_graph[1]
             else:
-                result_df = pd.DataFrame()
-
-            st.success("✅ Petrophysical calculations completed")
+                graph = EvaluationGraph({col: logs[col] for col in REQUIRED_COLS})
+                st.session_state["eval_graph"] = (dataset_key, graph)
+
+            # ---- SHARED RESULTS (same well + same inputs in another session) ----
+            eval_key = ("evaluation", dataset_key,
+                        tuple(zone_df[["Top Depth", "Base Depth"] + list(ZONE_PARAMS.values())].itertuples(index=False, name=None)),
+                        vsh_method, porosity_method, sw_method, vsh_cutoff, phi_cutoff, sw_cutoff)
+            with prof.stage("evaluate"):
+                eval_ready = graph.state_key == eval_key
+                snapshot = server_cache().get(eval_key) if not eval_ready else None
+                restored_from = "the shared server cache"
+                if snapshot is None and not eval_ready:
+                    # Same curves, zones and parameters as an evaluation stored for this well: no recompute
+                    snapshot = project.load_evaluation(well_name, eval_key)
+                    restored_from = f"the project ({well_name})"
+                    if snapshot is not None:
+                        server_cache().put(eval_key, snapshot)
+                if snapshot is not None:
+                    with graph.lock:
+                        graph.restore(snapshot)
+                    eval_ready = True
+                    st.caption(f"Results loaded from {restored_from}")
+                elif not eval_ready:
+                    # A newer request supersedes this session's previous evaluation; it is only
+                    # cancelled if no other session is waiting for the same one
+                    previous_key = st.session_state.get("eval_job")
+                    if previous_key is not None and previous_key != eval_key:
+                        job_queue().release(previous_key, job_waiter())
+                    st.session_state["eval_job"] = eval_key
+                    settings = (vsh_method, porosity_method, sw_method, vsh_cutoff, phi_cutoff, sw_cutoff)
+                    eval_job = background(eval_key, "Evaluation", evaluation_job,
+                                          graph, eval_key, zone_ids, zone_df, settings)
+                    if eval_job is not None:
+                        # Another session's graph may have run it: take its snapshot
+                        with graph.lock:
+                            if graph.state_key != eval_key:
+                                graph.restore(eval_job.result)
+                        job_queue().forget(eval_key)
+                        eval_ready = True
+            has_results = False
+            if eval_ready:
+                results = graph.results
+                st.caption("Recomputed samples: " + " | ".join(f"{node} {count:,}" for node, count in graph.recomputed.items()))
+
+                has_results = bool((zone_ids >= 0).any())
+
+                # Session memory: result curves + cached products (logs are memory-mapped)
+                st.sidebar.caption(f"Session memory: {(graph.nbytes + logs.nbytes) / 2**20:.1f} MB "
+                                   f"of {graph.memory_budget / 2**20:.0f} MB budget, "
+                                   f"{graph.evictions} cached products evicted")
+                with st.sidebar.expander("🖥️ Server cache"):
+                    shared_stats = server_cache().stats()
+                    st.caption(f"{shared_stats['entries']} datasets/results, {shared_stats['bytes'] / 2**20:.1f} MB "
+                               f"of {server_cache().max_bytes / 2**20:.0f} MB, {shared_stats['pinned']} in use "
+                               f"({shared_stats['leases']} sessions)")
+                    st.caption(f"Hit rate {shared_stats['hit_rate']:.0%} ({shared_stats['hits']} hits / "
+                               f"{shared_stats['misses']} misses), {shared_stats['evictions']} evictions, "
+                               f"{shared_stats['seconds_saved']:.1f} s saved")
+                    queue_stats = job_queue().stats()
+                    st.caption(f"Jobs: {queue_stats['running']} running / {queue_stats['queued']} queued on "
+                               f"{queue_stats['workers']} workers, {queue_stats['coalesced']} duplicate submissions coalesced")
+
+                # ---- SAVE TO PROJECT (background job, once per well and evaluation) ----
+                save_key = ("project", well_name, eval_key)
+                replace = st.session_state.get("project_replace") == (well_name, dataset_key)
+                if project_conflict and not replace:
+                    st.sidebar.warning(f"⚠️ {well_name} in the project holds other curves: rename this well "
+                                       "to save it, or replace the stored one")
+                    if st.sidebar.button(f"♻️ Replace stored {well_name}"):
+                        st.session_state["project_replace"] = (well_name, dataset_key)
+                        st.rerun()
+                elif st.session_state.get("project_saved") != save_key:
+                    save = job_queue().get(save_key)
+                    if save is None and project.has_evaluation(well_name, eval_key):
+                        st.session_state["project_saved"] = save_key
+                    elif save is None:
+                        with graph.lock:
+                            snapshot = graph.snapshot(eval_key)
+                        try:
+                            job_queue().submit(save_key, project_save_job, well_name, field_name, dataset_key,
+                                               curves, snapshot, zone_df, parameters, replace, label="Project save")
+                        except QueueFull:
+                            pass   # retried on the next rerun
+                    elif not save.active:
+                        if save.state == FAILED:
+                            st.sidebar.warning(f"⚠️ Could not save {well_name} to the project: {save.error}")
+                        st.session_state["project_saved"] = save_key
+                        job_queue().forget(save_key)
+
+                st.success("✅ Petrophysical calculations completed")
+
+                # ---- SATURATION SOLVER CHECK (samples clipped to 0 / 1 by the Sw equation) ----
+                sw_bad = graph.derived("sw_check", sw_method, lambda: sw_solver_mask(
+                    logs["RT"], graph.results["PHIE"], graph.results["Vsh"], zone_ids, zone_df, sw_method))
+                if sw_bad.any():
+                    bad_counts = np.bincount(zone_ids[sw_bad], minlength=len(zone_df))
+                    st.warning(f"⚠️ {sw_method}: {int(sw_bad.sum()):,} samples have no Sw root in [0, 1] "
+                               "and were clipped – " + ", ".join(
+                                   f"{zone_index.names[i]} {count:,}" for i, count in enumerate(bad_counts) if count))
+
+                # ---- CUTOFF SENSITIVITY (whole cutoff grid in one pass) ----
+                with st.expander("🎛️ Cutoff Sensitivity"):
+                    g1, g2, g3, g4 = st.columns(4)
+                    vsh_range = g1.slider("Vsh cutoff range", 0.0, 1.0, (0.0, 1.0))
+                    phi_range = g2.slider("Porosity cutoff range", 0.0, 0.5, (0.0, 0.3))
+                    sw_range = g3.slider("Sw cutoff range", 0.0, 1.0, (0.0, 1.0))
+                    # The cube grows with zones x steps³: fewer steps are allowed for many zones
+                    steps_cap = max(5, min(50, max_steps(len(zone_df))))
+                    n_steps = g4.number_input("Steps per cutoff", 5, steps_cap, min(20, steps_cap))
+                    vsh_grid = cutoff_grid(*vsh_range, n_steps)
+                    phi_grid = cutoff_grid(*phi_range, n_steps)
+                    sw_grid = cutoff_grid(*sw_range, n_steps)
+                    prof.watch(vsh_range=vsh_range, phi_range=phi_range, sw_range=sw_range, n_steps=n_steps)
+
+                    sens_key = (vsh_range, phi_range, sw_range, n_steps,
+                                tuple(zone_df[["Top Depth", "Base Depth"]].itertuples(index=False, name=None)))
+                    with prof.stage("sensitivity_cube"):
+                        cube = graph.derived("sensitivity", sens_key, lambda: net_cube(
+                            graph.results["Vsh"], graph.results["PHIE"], graph.results["Sw"], zone_ids,
+                            sample_intervals(depth), len(zone_df), vsh_grid, phi_grid, sw_grid))
+
+                    if len(zone_df):
+                        zone_pick = st.selectbox("Zone", range(len(zone_df)), format_func=lambda i: zone_index.names[i])
+                        gross = zone_df["Base Depth"].iloc[zone_pick] - zone_df["Top Depth"].iloc[zone_pick]
+                        show_ntg = st.toggle("Show net-to-gross instead of net thickness", value=False)
+                        prof.watch(sensitivity_zone=zone_pick, show_ntg=show_ntg)
+                        zone_cube = cube[zone_pick] / gross if show_ntg and gross > 0 else cube[zone_pick]
+                        value_label = "NTG" if show_ntg and gross > 0 else "Net thickness"
+
+                        vsh_at = st.select_slider("Vsh cutoff for the PHIE × Sw map", options=list(np.round(vsh_grid, 4)),
+                                                  value=float(np.round(vsh_grid[np.abs(vsh_grid - vsh_cutoff).argmin()], 4)))
+                        prof.watch(vsh_at=vsh_at)
+                        iv = int(np.abs(vsh_grid - vsh_at).argmin())
+                        heat = go.Figure(go.Heatmap(z=zone_cube[iv], x=sw_grid, y=phi_grid, colorbar=dict(title=value_label)))
+                        heat.update_layout(xaxis_title="Sw cutoff", yaxis_title="Porosity cutoff", height=450,
+                                           title=f"{value_label} – {zone_index.names[zone_pick]} at Vsh ≤ {vsh_at:g}")
+                        st.plotly_chart(heat, use_container_width=True)
+
+                        jp = int(np.abs(phi_grid - phi_cutoff).argmin())
+                        i_s = int(np.abs(sw_grid - sw_cutoff).argmin())
+                        c1, c2, c3 = st.columns(3)
+                        for column, grid, curve, label in [
+                            (c1, vsh_grid, zone_cube[:, jp, i_s], "Vsh cutoff"),
+                            (c2, phi_grid, zone_cube[iv, :, i_s], "Porosity cutoff"),
+                            (c3, sw_grid, zone_cube[iv, jp, :], "Sw cutoff"),
+                        ]:
+                            line = go.Figure(go.Scatter(x=grid, y=curve, mode="lines+markers"))
+                            line.update_layout(xaxis_title=label, yaxis_title=value_label, height=300,
+                                               margin=dict(l=40, r=10, t=30, b=40))
+                            column.plotly_chart(line, use_container_width=True)
+
+                        st.markdown("**Knee cutoffs per zone** (other two cutoffs held at the current values)")
+                        st.dataframe(zone_knees(cube, zone_index.names, vsh_grid, phi_grid, sw_grid,
+                                                vsh_cutoff, phi_cutoff, sw_cutoff).style.format(precision=3))
 
     # ============================================================
     # TAB 3 – LOG PLOTS
@@ -184,59 +628,57 @@ if st.session_state.get("authenticated"):
     with tab3:
         st.header("📈 Log & Interpretation Plots")
         
-        if uploaded_file and not result_df.empty:
-            fig, ax = plt.subplots(1, 7, figsize=(18, 100), sharey=True)
-
-            # 👉 Set depth ticks every 10 m
-            depth_locator = MultipleLocator(10)
-
-            # ---- GR ----
-            ax[0].plot(df["GR"], df["Depth"], color="green")
-            ax[0].set_xlabel("GR (API)")
-            ax[0].set_xlim(0, 150)
-
-            # ---- RHOB ----
-            ax[1].plot(df["RHOB"], df["Depth"], color="red")
-            ax[1].set_xlabel("RHOB (g/cc)")
-            ax[1].set_xlim(1.95, 2.95)
-
-            # ---- NPHI ----
-            ax[2].plot(df["NPHI"], df["Depth"], color="blue")
-            ax[2].set_xlabel("NPHI (v/v)")
-            ax[2].set_xlim(0.45, -0.15)
-
-            # ---- RT10 ----
-            ax[3].plot(df["RT"], df["Depth"], color="black")
-            ax[3].set_xlabel("RT (ohm.m)")
-            ax[3].set_xscale("log")
-            ax[3].set_xlim(0.2, 2000)
-
-            # ---- Vsh ----
-            if not result_df.empty:
-                ax[4].plot(result_df["Vsh"], result_df["Depth"], color="green")
-                ax[4].set_xlabel("Vsh")
-                ax[4].set_xlim(0, 1)
-
-            # ---- PHIE ----
-            if not result_df.empty:
-                ax[5].plot(result_df["PHIE"], result_df["Depth"], color="blue")
-                ax[5].set_xlabel("PHIE")
-                ax[5].set_xlim(0, 1)
-            
-            # ---- Sw ----
-            if not result_df.empty:
-                ax[6].plot(result_df["Sw"], result_df["Depth"], color="purple")
-                ax[6].set_xlabel("Sw")
-                ax[6].set_xlim(0, 1)
-
-            # ---- Common formatting ----
-            for a in ax:
-                a.invert_yaxis()
-                a.grid(True, linestyle="--", alpha=0.5)
-                a.yaxis.set_major_locator(depth_locator)
-
-            plt.tight_layout()
-            st.pyplot(fig)
+        if data_ready and has_results:
+            top_view, base_view = st.slider("**Depth window** (zoom in for full resolution)",
+                                            float(depth[0]), float(depth[-1]), (float(depth[0]), float(depth[-1])))
+
+            # ---- LEVEL-OF-DETAIL (min/max envelope per pixel row) ----
+            with prof.stage("plot_pyramids"):
+                log_pyramids = graph.derived(
+                    "log_pyramids", None, uses_results=False,
+                    build=lambda: {col: MinMaxPyramid(depth, logs[col]) for col in ["GR", "RHOB", "NPHI", "RT"]})
+                log_pyramids = {**log_pyramids, **graph.derived(
+                    "plot_pyramids", None,
+                    lambda: {col: MinMaxPyramid(depth, graph.results[col]) for col in ["Vsh", "PHIE", "Sw"]})}
+
+            viewer = st.radio("Viewer", ["Interactive (WebGL)", "Static image"], horizontal=True)
+            prof.watch(depth_window=(top_view, base_view), viewer=viewer)
+
+            # ---- RENDER CACHE (data hash + result hash + track settings) ----
+            render_cache = plot_cache()
+            results_hash = graph.derived("results_hash", None,
+                                         lambda: array_hash(*(graph.results[col] for col in ["Vsh", "PHIE", "Sw"])))
+            plot_key = (dataset_key, results_hash, viewer, top_view, base_view)
+
+            def render_static():
+                return static_log_png(log_pyramids, top_view, base_view)
+
+            def render_webgl():
+                # Only the window (at pixel resolution) and a coarse overview go to the browser
+                return plotly_log_figure(log_pyramids, top_view, base_view, n_pixels=1200,
+                                         uirevision=f"{dataset_key}:{top_view}:{base_view}").to_json()
+
+            def render_job(job, build):
+                job.report(0.0, "rendering")
+                return render_cache.get_or_build(plot_key, build)
+
+            with prof.stage("plot_render"):
+                build = render_webgl if viewer == "Interactive (WebGL)" else render_static
+                rendered = render_cache.get(plot_key)
+                if rendered is None:
+                    render = background(("plot",) + plot_key, "Log plot", render_job, build)
+                    if render is not None:
+                        rendered = render.result
+                        job_queue().forget(("plot",) + plot_key)
+                if rendered is not None and viewer == "Interactive (WebGL)":
+                    st.plotly_chart(json.loads(rendered), use_container_width=True)
+                elif rendered is not None:
+                    st.image(rendered, use_container_width=True)
+
+            cache_stats = render_cache.stats()
+            st.caption(f"Plot cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                       f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} plots, "
+                       f"{cache_stats['bytes'] / 2**20:.1f} MB, {cache_stats['seconds_saved']:.1f} s rendering saved")
 
 
     # ============================================================
@@ -245,44 +687,76 @@ if st.session_state.get("authenticated"):
     with tab4:
         st.header("📊 Zone & Reservoir Summary")
 
-        if uploaded_file and not result_df.empty:
+        if data_ready and has_results:
 
-            summaries = []
-            dz = df["Depth"].diff().median()
+            # ---- GROUPED REDUCTION (all zones in one pass over zone ids) ----
+            # Rebuilt only when a result curve or the zone geometry changed
+            zone_key = tuple(zone_df[["Zone Name", "Top Depth", "Base Depth"]].itertuples(index=False, name=None))
+            with prof.stage("zone_summary"):
+                summary_df = graph.derived("summary", zone_key,
+                                           lambda: zone_summary(depth, zone_ids, graph.results, zone_df))
 
-            for _, zone in zone_df.iterrows():
-                zone_name = zone["Zone Name"]
-                top_depth = zone["Top Depth"]
-                base_depth = zone["Base Depth"]
+            st.subheader("📋 Petrophysical Zone Summary")
+            with prof.stage("summary_table"):
+                st.dataframe(summary_df.style.format(SUMMARY_FORMAT))
 
-                z = result_df[result_df["Zone"] == zone_name]
-                if z.empty:
-                    continue
+            # Shared with the Volumetrics page (one entry per evaluated well)
+            st.session_state.setdefault("zone_summaries", {})[well_name] = summary_df.assign(Field=field_name)
+            st.caption("Thickness weights each sample by its own depth interval. "
+                       "Net PHIE is thickness-weighted and Net Sw pore-volume-weighted over net pay. "
+                       "HCPT = Σ PHIE·(1−Sw)·h over net pay.")
 
-                net_thickness = z["Net"].sum() * dz
-                gross_thickness = base_depth - top_depth
-                ntg = net_thickness / gross_thickness if gross_thickness > 0 else 0
+            st.success("✅ Zone-level petrophysical summary generated")
 
-                summaries.append({
-                    "Zone Name": zone_name,
-                    "Top Depth": top_depth,
-                    "Bottom Depth": base_depth,
-                    "Net Thickness": net_thickness,
-                    "Net-to-Gross (NTG)": ntg,
-                    "Avg Vsh": z["Vsh"].mean(),
-                    "Avg PHIE": z["PHIE"].mean(),
-                    "Avg Sw": z["Sw"].mean()
-                })
+            # ---- EXPORT (streamed to a file by a background job, then downloaded) ----
+            st.subheader("⬇️ Export")
+            x1, x2 = st.columns(2)
+            formats = available_formats()
+            export_format = x1.selectbox("**Result curves format**", formats, key="export_format")
+            extension, mime = EXPORT_FORMATS[export_format]
+            depth_unit = "m"
+            if export_format == "LAS 2.0":
+                depth_unit = x1.radio("**Depth unit**", list(LAS_DEPTH_UNITS), horizontal=True, key="export_depth_unit")
+            export_key = ("export", eval_key, tuple(zone_df["Zone Name"].astype(str)), export_format,
+                          well_name, field_name, depth_unit)
+            export_path = os.path.join(EXPORT_DIR, content_hash(repr(export_key).encode()) + extension)
+            export_ready = os.path.exists(export_path)
+            if not export_ready and (x1.button("📦 Prepare export") or job_queue().get(export_key) is not None):
+                with x1:
+                    export = background(export_key, "Export", export_job, export_path, curves, dict(graph.results),
+                                        zone_ids, zone_df, export_format, well_name, field_name, depth_unit)
+                if export is not None:
+                    job_queue().forget(export_key)
+                    export_ready = True
+            if export_ready:
+                # Streamlit reads the file into memory to serve it: only in the run the user asks for it,
+                # the link is dropped again on the next rerun
+                export_mb = os.path.getsize(export_path) / 2**20
+                if x1.button(f"📥 Get {export_format} download ({export_mb:.1f} MB)"):
+                    with open(export_path, "rb") as fh:
+                        x1.download_button(f"💾 Save {export_format}", fh, mime=mime,
+                                           file_name=f"{well_name}_results{extension}")
+            if "Parquet" not in formats:
+                x1.caption("Install pyarrow for Parquet / Arrow export")
+
+            summary_format = x2.selectbox("**Zone summary format**", [fmt for fmt in formats if fmt != "LAS 2.0"],
+                                          key="summary_format")
+            x2.download_button("💾 Download zone summary", export_table(summary_df, summary_format),
+                               mime=EXPORT_FORMATS[summary_format][1],
+                               file_name=f"{well_name}_zone_summary{EXPORT_FORMATS[summary_format][0]}")
 
-            summary_df = pd.DataFrame(summaries)
-            st.subheader("📋 Petrophysical Zone Summary")
-            st.dataframe(summary_df.style.format({
-                "Net Thickness": "{:.2f}",
-                "Net-to-Gross (NTG)": "{:.2f}",
-                "Avg Vsh": "{:.2f}",
-                "Avg PHIE": "{:.2f}",
-                "Avg Sw": "{:.2f}"
-            }))
-
-            st.success("✅ Zone-level petrophysical summary generated")
+    # ============================================================
+    # SIDEBAR – PROFILING PANEL
+    # ============================================================
+    session_profile = st.session_state.setdefault("profile", SessionProfile())
+    run_record = prof.finish(session_profile)
+    if run_record is not None:
+        with st.sidebar.expander("⏱️ Profiling", expanded=True):
+            st.caption(f"Rerun #{run_record['rerun']} triggered by: {', '.join(run_record['trigger'])}")
+            st.caption(f"Total {run_record['wall_s'] * 1e3:.0f} ms wall, {run_record['cpu_s'] * 1e3:.0f} ms CPU")
+            st.dataframe(prof.frame().style.format({"wall_s": "{:.4f}", "cpu_s": "{:.4f}", "peak_mb": "{:.1f}"}),
+                         hide_index=True)
+            history = [{"rerun": r["rerun"], "trigger": ", ".join(r["trigger"]), "wall_s": r["wall_s"]}
+                       for r in session_profile.history]
+            st.line_chart(pd.DataFrame(history).set_index("rerun")["wall_s"])
 
@@ -1,5 +1,12 @@
 import streamlit as st 
 import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+
+from logapp.volumetrics import (
+    DISTRIBUTIONS, GAS_FACTOR, INPUTS, OIL_FACTOR, simulate, zone_volume_table, zone_volumes,
+)
+from logapp.project import project_store
 
 if not st.session_state.get("authenticated"):
     st.warning("Please login first")
@@ -17,51 +24,154 @@ if st.session_state.get("authenticated"):
     Hydrocarbon_Type = st.selectbox('**Choose Type**', ["Oil", "Gas"])
     st.write("________________________")
 
-    if Hydrocarbon_Type == 'Oil' :
-        Area_A_Acres = st.number_input('**Area_A_Acres**', value=100)
-        Net_Pay_Thickness_H_ft =  st.number_input('**Net_Pay_Thickness_H_ft**', value=10)
-        Effective_Porosity_PHIE_fraction =  st.number_input('**Effective_Porosity_PHIE_fraction**', value=0.1)
-        Water_Saturation_SW_fraction =  st.number_input('**Water_Saturation_SW_fraction**', value=0.2)
-        Oil_formation_volume_factor_Bo =  st.number_input('**Oil_formation_volume_factor_Bo**' , format="%.2f" ,value=1.5)
-        Conversion_factor =  st.number_input('**Conversion_factor (7758)**', value=7758)
-        st.write("________________________")
-        OOIP_STB = Conversion_factor * Area_A_Acres * Net_Pay_Thickness_H_ft * Effective_Porosity_PHIE_fraction * (1-Water_Saturation_SW_fraction) /Oil_formation_volume_factor_Bo
-        Compute_Button = st.button(":red[**OOIP_STB**]")
-        st.write("**OOIP_STB**: ", OOIP_STB)
-        st.write("________________________")
-        Recovery_Factor_fraction = st.number_input('**Recovery_Factor_fraction**', value=0.1)
-        st.write("________________________")
-        Recoverable_Oil = OOIP_STB * Recovery_Factor_fraction 
-        Compute_Button = st.button(":red[**Recoverable_Oil**]")
-        st.write("**Recoverable_Oil**: ", Recoverable_Oil)
-
-
-    if Hydrocarbon_Type == 'Gas' :
-        Area_A_Acres = st.number_input('**Area_A_Acres**', value=100)
-        Net_Pay_Thickness_H_ft =  st.number_input('**Net_Pay_Thickness_H_ft**', value=10)
-        Effective_Porosity_PHIE_fraction =  st.number_input('**Effective_Porosity_PHIE_fraction**', value=0.1)
-        Water_Saturation_SW_fraction =  st.number_input('**Water_Saturation_SW_fraction**', value=0.2)
-        Gas_formation_volume_factor_Bg =  st.number_input('**Gas_formation_volume_factor_Bg**' , format="%.5f" ,value=0.005)
-        Conversion_factor =  st.number_input('**Conversion_factor (43560)**', value=43560)
-        st.write("________________________")
-        OGIP_SCF = Conversion_factor * Area_A_Acres * Net_Pay_Thickness_H_ft * Effective_Porosity_PHIE_fraction * (1-Water_Saturation_SW_fraction) /Gas_formation_volume_factor_Bg
-        Compute_Button = st.button(":red[OGIP_SCF]")
-        st.write("**OGIP_SCF**: ", OGIP_SCF)
-        st.write("________________________")
-        Recovery_Factor_fraction = st.number_input('**Recovery_Factor_fraction**', value=0.5)
-        st.write("________________________")
-        Recoverable_Gas = OGIP_SCF * Recovery_Factor_fraction 
-        Compute_Button = st.button(":red[**Recoverable_Gas**]")
-        st.write("**Recoverable_Gas**: ", Recoverable_Gas)
-    
-
-
-
-
-  
-
-
-
-
-
+    Mode = st.radio('**Mode**', ["Deterministic", "Probabilistic (Monte Carlo)", "Per-zone (from log evaluation)"], horizontal=True)
+    st.write("________________________")
 
+    if Mode == "Deterministic":
+        if Hydrocarbon_Type == 'Oil' :
+            Area_A_Acres = st.number_input('**Area_A_Acres**', value=100)
+            Net_Pay_Thickness_H_ft =  st.number_input('**Net_Pay_Thickness_H_ft**', value=10)
+            Effective_Porosity_PHIE_fraction =  st.number_input('**Effective_Porosity_PHIE_fraction**', value=0.1)
+            Water_Saturation_SW_fraction =  st.number_input('**Water_Saturation_SW_fraction**', value=0.2)
+            Oil_formation_volume_factor_Bo =  st.number_input('**Oil_formation_volume_factor_Bo**' , format="%.2f" ,value=1.5)
+            Conversion_factor =  st.number_input('**Conversion_factor (7758)**', value=7758)
+            st.write("________________________")
+            OOIP_STB = Conversion_factor * Area_A_Acres * Net_Pay_Thickness_H_ft * Effective_Porosity_PHIE_fraction * (1-Water_Saturation_SW_fraction) /Oil_formation_volume_factor_Bo
+            Compute_Button = st.button(":red[**OOIP_STB**]")
+            st.write("**OOIP_STB**: ", OOIP_STB)
+            st.write("________________________")
+            Recovery_Factor_fraction = st.number_input('**Recovery_Factor_fraction**', value=0.1)
+            st.write("________________________")
+            Recoverable_Oil = OOIP_STB * Recovery_Factor_fraction 
+            Compute_Button = st.button(":red[**Recoverable_Oil**]")
+            st.write("**Recoverable_Oil**: ", Recoverable_Oil)
+
+
+        if Hydrocarbon_Type == 'Gas' :
+            Area_A_Acres = st.number_input('**Area_A_Acres**', value=100)
+            Net_Pay_Thickness_H_ft =  st.number_input('**Net_Pay_Thickness_H_ft**', value=10)
+            Effective_Porosity_PHIE_fraction =  st.number_input('**Effective_Porosity_PHIE_fraction**', value=0.1)
+            Water_Saturation_SW_fraction =  st.number_input('**Water_Saturation_SW_fraction**', value=0.2)
+            Gas_formation_volume_factor_Bg =  st.number_input('**Gas_formation_volume_factor_Bg**' , format="%.5f" ,value=0.005)
+            Conversion_factor =  st.number_input('**Conversion_factor (43560)**', value=43560)
+            st.write("________________________")
+            OGIP_SCF = Conversion_factor * Area_A_Acres * Net_Pay_Thickness_H_ft * Effective_Porosity_PHIE_fraction * (1-Water_Saturation_SW_fraction) /Gas_formation_volume_factor_Bg
+            Compute_Button = st.button(":red[OGIP_SCF]")
+            st.write("**OGIP_SCF**: ", OGIP_SCF)
+            st.write("________________________")
+            Recovery_Factor_fraction = st.number_input('**Recovery_Factor_fraction**', value=0.5)
+            st.write("________________________")
+            Recoverable_Gas = OGIP_SCF * Recovery_Factor_fraction 
+            Compute_Button = st.button(":red[**Recoverable_Gas**]")
+            st.write("**Recoverable_Gas**: ", Recoverable_Gas)
+
+    # ============================================================
+    # PROBABILISTIC VOLUMETRICS (MONTE CARLO)
+    # ============================================================
+    if Mode == "Probabilistic (Monte Carlo)":
+        if Hydrocarbon_Type == 'Oil':
+            factor, volume_unit, fvf_name = OIL_FACTOR, "STB", "Bo"
+            fvf = {"Distribution": "Fixed", "Min": 1.3, "Mode": 1.5, "Max": 1.7, "Mean": 1.5, "SD": 0.1}
+            rf = {"Distribution": "Triangular", "Min": 0.05, "Mode": 0.1, "Max": 0.2, "Mean": 0.1, "SD": 0.03}
+        else:
+            factor, volume_unit, fvf_name = GAS_FACTOR, "SCF", "Bg"
+            fvf = {"Distribution": "Fixed", "Min": 0.004, "Mode": 0.005, "Max": 0.006, "Mean": 0.005, "SD": 0.0005}
+            rf = {"Distribution": "Triangular", "Min": 0.4, "Mode": 0.5, "Max": 0.7, "Mean": 0.5, "SD": 0.05}
+
+        default_specs = pd.DataFrame([
+            {"Input": "Area", "Distribution": "Triangular", "Min": 60.0, "Mode": 100.0, "Max": 160.0, "Mean": 100.0, "SD": 20.0},
+            {"Input": "Net Pay", "Distribution": "Lognormal", "Min": 5.0, "Mode": 10.0, "Max": 20.0, "Mean": 10.0, "SD": 3.0},
+            {"Input": "PHIE", "Distribution": "Normal", "Min": 0.06, "Mode": 0.1, "Max": 0.14, "Mean": 0.1, "SD": 0.02},
+            {"Input": "Sw", "Distribution": "Uniform", "Min": 0.15, "Mode": 0.2, "Max": 0.3, "Mean": 0.2, "SD": 0.04},
+            {"Input": "FVF", **fvf},
+            {"Input": "RF", **rf},
+        ])
+        st.markdown(f"**Input distributions** (Area in acres, Net Pay in ft, FVF = {fvf_name}). "
+                    "Triangular/Uniform use Min-Mode-Max, Normal/Lognormal use Mean-SD, Fixed uses Mode.")
+        spec_df = st.data_editor(
+            default_specs, hide_index=True, disabled=["Input"], key=f"mc_specs_{Hydrocarbon_Type}",
+            column_config={"Distribution": st.column_config.SelectboxColumn(options=DISTRIBUTIONS, required=True)},
+        )
+
+        correlation = None
+        if st.checkbox("Correlate inputs"):
+            st.caption("Rank-style correlation between inputs (Gaussian copula); keep the matrix symmetric.")
+            correlation = st.data_editor(pd.DataFrame(np.eye(len(INPUTS)), index=INPUTS, columns=INPUTS),
+                                         key="mc_correlation").to_numpy()
+
+        n_trials = st.select_slider("**Trials**", [100_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000], value=1_000_000)
+        seed = st.number_input("Random seed", value=42, step=1)
+
+        if st.button(":red[**Run Monte Carlo**]"):
+            specs = {row["Input"]: row for row in spec_df.to_dict("records")}
+            try:
+                st.session_state["mc_result"] = (Hydrocarbon_Type, simulate(specs, n_trials, factor, correlation, int(seed)))
+            except (ValueError, TypeError) as exc:
+                st.error(f"❌ {exc}")
+
+        mc = st.session_state.get("mc_result")
+        if mc and mc[0] == Hydrocarbon_Type:
+            mc = mc[1]
+            st.write("________________________")
+            st.subheader(f"📊 Results ({volume_unit})")
+            st.dataframe(mc["percentiles"].style.format("{:,.0f}"))
+
+            fig = go.Figure()
+            for label, (x, p) in [("In place", mc["cdf_in_place"]), ("Recoverable", mc["cdf_recoverable"])]:
+                # Exceedance curve: P90 on the left, P10 on the right
+                fig.add_trace(go.Scatter(x=x, y=1 - p, mode="lines", name=label))
+            fig.update_layout(title="Probability of exceedance", xaxis_title=volume_unit, yaxis_title="P(X ≥ x)",
+                              xaxis_type="log", yaxis_tickformat=".0%")
+            st.plotly_chart(fig, use_container_width=True)
+
+            tornado_df = mc["tornado"].iloc[::-1]
+            base = tornado_df.attrs["base"]
+            fig = go.Figure()
+            fig.add_trace(go.Bar(y=tornado_df["Input"], x=tornado_df["Low Result"] - base, base=base,
+                                 orientation="h", name="Input at P90"))
+            fig.add_trace(go.Bar(y=tornado_df["Input"], x=tornado_df["High Result"] - base, base=base,
+                                 orientation="h", name="Input at P10"))
+            fig.update_layout(title=f"Tornado – recoverable {volume_unit}", barmode="overlay")
+            st.plotly_chart(fig, use_container_width=True)
+
+
+    # ============================================================
+    # PER-ZONE VOLUMETRICS (FROM LOG EVALUATION)
+    # ============================================================
+    if Mode == "Per-zone (from log evaluation)":
+        if Hydrocarbon_Type == 'Oil':
+            factor, volume_unit, fvf_default, rf_default = OIL_FACTOR, "STB", 1.5, 0.1
+        else:
+            factor, volume_unit, fvf_default, rf_default = GAS_FACTOR, "SCF", 0.005, 0.5
+
+        # This session's wells, then the latest stored evaluation of every other project well
+        session_summaries = st.session_state.get("zone_summaries", {})
+        summaries = [summary.assign(Well=well) for well, summary in session_summaries.items()]
+        summaries += [summary.assign(Well=well) for well, summary in project_store().summaries().items()
+                      if well not in session_summaries]
+        field_file = st.file_uploader("…or add a field summary CSV (Batch Evaluation output)", type=["csv"])
+        if field_file:
+            summaries.append(pd.read_csv(field_file))
+
+        if not summaries:
+            st.info("ℹ️ Evaluate a well on the Well Logging Evaluation page first, or upload a field summary")
+        else:
+            st.caption("Net pay comes from the evaluated zone summary: HCPT = Σ PHIE·(1−Sw)·h over net pay. "
+                       "Set area, FVF (Bo/Bg) and recovery factor per zone below.")
+            depth_unit = st.radio("Log depth unit", ["ft", "m"], horizontal=True)
+            table = zone_volume_table(pd.concat(summaries, ignore_index=True), fvf=fvf_default, rf=rf_default)
+            table = st.data_editor(
+                table, hide_index=True, key=f"zone_volumes_{Hydrocarbon_Type}",
+                disabled=["Well", "Zone Name", "Net Thickness", "Net PHIE (h-wtd)", "Net Sw (PV-wtd)", "HCPT"],
+            )
+
+            volumes = zone_volumes(table, factor, depth_unit)
+            st.write("________________________")
+            st.subheader(f"📊 Volumes per Zone ({volume_unit})")
+            st.dataframe(volumes.style.format({"In Place": "{:,.0f}", "Recoverable": "{:,.0f}"}))
+
+            per_well = volumes.groupby("Well", sort=False)[["In Place", "Recoverable"]].sum()
+            st.subheader(f"🛢️ Volumes per Well ({volume_unit})")
+            st.dataframe(per_well.style.format("{:,.0f}"))
+            st.write(f"**Total In Place**: {volumes['In Place'].sum():,.0f} {volume_unit}")
+            st.write(f"**Total Recoverable**: {volumes['Recoverable'].sum():,.0f} {volume_unit}")
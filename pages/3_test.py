@@ -8,6 +8,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from logapp.engine import (
+    vsh_linear, density_porosity, neutron_density_porosity, effective_porosity, sw_archie,
+)
+from logapp.synthetic import synthetic_well
+
 # ============================================
 # PAGE CONFIGURATION
 # ============================================
@@ -93,47 +98,24 @@ sw_cutoff = st.sidebar.slider("Sw Cutoff", 0.0, 1.0, 0.6)
 # ============================================
 # MOCK LOG DATA (Replace with real data later)
 # ============================================
-depth = np.linspace(950, 1300, 700)
-
-logs = pd.DataFrame({
-    "Depth": depth,
-    "GR": np.random.uniform(20, 130, len(depth)),
-    "RHOB": np.random.uniform(2.1, 2.7, len(depth)),
-    "NPHI": np.random.uniform(0.05, 0.35, len(depth)),
-    "RT": np.random.uniform(0.2, 200, len(depth))
-})
-
-# ============================================
-# PETROPHYSICAL FUNCTIONS
-# ============================================
-def calculate_vsh(gr, gr_clean, gr_shale):
-    vsh = (gr - gr_clean) / (gr_shale - gr_clean)
-    return np.clip(vsh, 0, 1)
-
-def density_porosity(rhob, rho_ma, rho_fl):
-    return (rho_ma - rhob) / (rho_ma - rho_fl)
-
-def total_porosity(phi_d, phi_n):
-    return (phi_d + phi_n) / 2
-
-def effective_porosity(phi_t, vsh):
-    return phi_t * (1 - vsh)
-
-def sw_archie(rt, phi, rw, a, m, n):
-    return ((a * rw) / (rt * (phi ** m))) ** (1 / n)
+# Seeded layered synthetic well, so the page looks the same on every rerun
+logs, _ = synthetic_well(700, n_zones=3, seed=0, top=950.0, base=1300.0)
+logs = logs.drop(columns="PE")
+depth = logs["Depth"].to_numpy()
 
 # ============================================
 # CALCULATIONS
 # ============================================
-logs["Vsh"] = calculate_vsh(logs["GR"], gr_clean, gr_shale)
+logs["Vsh"] = vsh_linear(logs["GR"], gr_clean, gr_shale)
 logs["PHID"] = density_porosity(logs["RHOB"], rho_matrix, rho_fluid)
-logs["PHIT"] = total_porosity(logs["PHID"], logs["NPHI"])
+logs["PHIT"] = neutron_density_porosity(logs["NPHI"], logs["PHID"])
 logs["PHIE"] = effective_porosity(logs["PHIT"], logs["Vsh"])
 
 logs["Sw"] = sw_archie(
     logs["RT"],
+    rw,
     logs["PHIE"].replace(0, np.nan),
-    rw, a, m, n
+    a, m, n
 )
 
 logs["Sw"] = logs["Sw"].clip(0, 1)
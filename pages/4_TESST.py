@@ -9,6 +9,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 # from matplotlib.ticker import MultipleLocator , AutoMinorLocator
 
+from logapp.engine import (
+    vsh_linear, vsh_larionov, density_porosity, neutron_density_porosity,
+    sw_archie, sw_simandoux, sw_indonesian,
+)
+
 
 
 st.sidebar.header("🧾 Well Information")
@@ -76,33 +81,6 @@ with tab1:
 
     zone_df = st.data_editor(pd.DataFrame(zone_input), num_rows="dynamic")
 
-# ============================================================
-# PETROPHYSICAL FUNCTIONS
-# ============================================================
-def vsh_linear(gr, gr_clean, gr_shale):
-    vsh = (gr - gr_clean) / (gr_shale - gr_clean)
-    return np.clip(vsh, 0, 1)
-
-def vsh_larionov(gr, gr_clean, gr_shale):
-    igr = (gr - gr_clean) / (gr_shale - gr_clean)
-    vsh = 0.083 * (2 ** (3.7 * igr) - 1)
-    return np.clip(vsh, 0, 1)
-
-def density_porosity(rhob, rho_matrix, rho_fluid):
-    return (rho_matrix - rhob) / (rho_matrix - rho_fluid)
-
-def neutron_density_porosity(nphi, phi_d):
-    return (nphi + phi_d) / 2
-
-def sw_archie(rt, rw, phi, a, m, n):
-    return ((a * rw) / (rt * (phi ** m))) ** (1 / n)
-
-def sw_simandoux(rt, rw, phi, vsh):
-    return np.sqrt((rw / rt) / (phi ** 2 + vsh))
-
-def sw_indonesian(rt, rw, phi, vsh, m, n):
-    return ((rw / rt) ** (1 / n)) / (phi ** m + vsh ** 2)
-
 # ============================================================
 # TAB 2 – PETROPHYSICAL CALCULATIONS
 # ============================================================
@@ -0,0 +1,191 @@
+# ============================================================
+# MULTI-WELL BATCH EVALUATION
+# ============================================================
+
+import os
+import tempfile
+import uuid
+import zipfile
+
+import streamlit as st
+
+from logapp.batch import run_batch
+from logapp.export import EXPORT_DIR, prune_exports
+from logapp.ingest import content_hash
+from logapp.jobs import CANCELLED, DONE, FAILED, QueueFull, job_queue
+from logapp.kernel import VSH_METHODS, POROSITY_METHODS, SW_METHODS
+from logapp.summary import SUMMARY_FORMAT
+
+
+# ============================================================
+# BACKGROUND BATCH JOB
+# ============================================================
+def batch_job(job, wells_zip, wells_folder, shared_zones_data, settings, max_workers, archive_path):
+    def report(done, total, well, error):
+        job.report(done / max(total, 1), f"{done}/{total} wells – last: {well}" + (f" ❌ {error}" if error else ""))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = wells_folder
+        if wells_zip:
+            source = os.path.join(tmp, "wells.zip")
+            with open(source, "wb") as fh:
+                fh.write(wells_zip)
+        shared_zones = None
+        if shared_zones_data:
+            shared_zones = os.path.join(tmp, "shared_zones.csv")
+            with open(shared_zones, "wb") as fh:
+                fh.write(shared_zones_data)
+
+        out_dir = os.path.join(tmp, "out")
+        field_summary, failures = run_batch(source, out_dir, shared_zones, settings,
+                                            max_workers=max_workers, progress=report)
+
+        # Zip the per-well results to disk while the temp folder still exists; it is
+        # only read back when the user asks for the download
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        partial = f"{archive_path}.partial"
+        try:
+            with zipfile.ZipFile(partial, "w", zipfile.ZIP_DEFLATED) as zf:
+                for root, _, files in os.walk(out_dir):
+                    for fname in files:
+                        path = os.path.join(root, fname)
+                        zf.write(path, os.path.relpath(path, out_dir))
+            os.replace(partial, archive_path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+    prune_exports()
+    return field_summary, failures, archive_path
+
+
+@st.fragment(run_every=1.0)
+def batch_progress(key):
+    job = job_queue().get(key)
+    if job is None or not job.active:
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {job.message or job.state} ({job.elapsed():.0f} s)")
+    if st.button("✖️ Cancel batch"):
+        # Only stops the run if no other session is waiting for it
+        job_queue().release(key, job_waiter())
+        del st.session_state["batch_job"]
+        st.rerun()
+
+
+def job_waiter():
+    # This session's token on the shared jobs it is waiting for
+    return st.session_state.setdefault("job_waiter", uuid.uuid4().hex)
+
+
+if not st.session_state.get("authenticated"):
+    st.warning("Please login first")
+    st.switch_page("Welcome.py")
+
+if st.session_state.get("authenticated"):
+    st.set_page_config(page_title="Batch Evaluation", layout="wide")
+    st.title("🗂️ Multi-Well Batch Evaluation")
+    st.write("________________________")
+    st.markdown(
+        """
+        - Upload a **zip of well CSVs** (or point to a folder on the server)
+        - Zone table per well: `<well>_zones.csv` next to the well or `zones/<well>.csv`
+        - Or upload **one shared zone table** used for every well without its own
+        """
+    )
+    st.write("________________________")
+
+    # ============================================================
+    # INPUTS
+    # ============================================================
+    wells_zip = st.file_uploader("Wells (zip of CSV files)", type=["zip"])
+    wells_folder = st.text_input("…or a folder on the server", "")
+    shared_zone_file = st.file_uploader("Shared zone table (CSV, optional)", type=["csv"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        vsh_method = st.selectbox("Shale Volume Method", VSH_METHODS)
+        vsh_cutoff = st.number_input("Vsh Cutoff", value=0.4)
+    with col2:
+        porosity_method = st.selectbox("Porosity Method", POROSITY_METHODS)
+        phi_cutoff = st.number_input("Porosity Cutoff", value=0.10)
+    with col3:
+        sw_method = st.selectbox("Water Saturation Method", SW_METHODS)
+        sw_cutoff = st.number_input("Water Saturation Cutoff", value=0.6)
+
+    max_workers = st.number_input("Worker processes", 1, os.cpu_count() or 1, os.cpu_count() or 1)
+    run_btn = st.button(":red[**Run batch**]")
+
+    # ============================================================
+    # RUN
+    # ============================================================
+    if run_btn:
+        if not wells_zip and not os.path.isdir(wells_folder):
+            st.error("❌ Upload a zip of wells or give an existing folder")
+        else:
+            settings = {
+                "vsh_method": vsh_method, "porosity_method": porosity_method, "sw_method": sw_method,
+                "vsh_cutoff": vsh_cutoff, "phi_cutoff": phi_cutoff, "sw_cutoff": sw_cutoff,
+            }
+            wells_data = wells_zip.getvalue() if wells_zip else None
+            shared_zones_data = shared_zone_file.getvalue() if shared_zone_file else None
+            # Same inputs from any session share one run
+            if wells_data:
+                source_key = content_hash(wells_data)
+            else:
+                # A folder counts as changed when any file in it is newer
+                source_key = (os.path.abspath(wells_folder), max(
+                    (os.path.getmtime(os.path.join(root, f)) for root, _, files in os.walk(wells_folder) for f in files),
+                    default=0.0))
+            batch_key = ("batch", source_key,
+                         content_hash(shared_zones_data) if shared_zones_data else None,
+                         tuple(settings.items()), int(max_workers))
+            archive_path = os.path.join(EXPORT_DIR, content_hash(repr(batch_key).encode()) + ".zip")
+            try:
+                job_queue().submit(batch_key, batch_job, wells_data, wells_folder, shared_zones_data,
+                                   settings, int(max_workers), archive_path, label="Batch", waiter=job_waiter())
+                st.session_state["batch_job"] = batch_key
+            except QueueFull as exc:
+                st.warning(f"⏳ Server busy ({exc}) – try again shortly")
+
+    # ---- RUNNING / FINISHED JOB (picked up on the next rerun) ----
+    if "batch_job" in st.session_state:
+        batch_key = st.session_state["batch_job"]
+        job = job_queue().get(batch_key)
+        if job is None:
+            del st.session_state["batch_job"]
+        elif job.state == DONE:
+            st.session_state["batch_result"] = job.result
+            del st.session_state["batch_job"]
+            job_queue().forget(batch_key)
+        elif job.state == FAILED:
+            st.error(f"❌ Batch failed: {job.error}")
+            del st.session_state["batch_job"]
+            job_queue().forget(batch_key)
+        elif job.state == CANCELLED:
+            st.info("✖️ Batch cancelled")
+            del st.session_state["batch_job"]
+            job_queue().forget(batch_key)
+        else:
+            batch_progress(batch_key)
+
+    # ============================================================
+    # RESULTS
+    # ============================================================
+    if "batch_result" in st.session_state:
+        field_summary, failures, archive = st.session_state["batch_result"]
+        n_wells = field_summary["Well"].nunique() if not field_summary.empty else 0
+        st.success(f"✅ {n_wells} wells evaluated, {len(failures)} failed")
+
+        if not field_summary.empty:
+            st.subheader("📋 Field Summary")
+            st.dataframe(field_summary.style.format(SUMMARY_FORMAT))
+        if not failures.empty:
+            st.subheader("⚠️ Failed Wells")
+            st.dataframe(failures[["Well", "Error"]])
+
+        st.download_button("⬇️ Field summary (CSV)", field_summary.to_csv(index=False), "field_summary.csv", "text/csv")
+        # Streamlit reads the file into memory to serve it: only in the run the user asks for it
+        if not os.path.exists(archive):
+            st.caption("The results zip has been cleaned up – run the batch again to rebuild it")
+        elif st.button(f"📥 Get results zip ({os.path.getsize(archive) / 2**20:.1f} MB)"):
+            with open(archive, "rb") as fh:
+                st.download_button("⬇️ All results (zip)", fh, "batch_results.zip", "application/zip")